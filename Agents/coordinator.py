@@ -2,32 +2,45 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Optional, TYPE_CHECKING
+from typing import Any, Iterable, Optional, Tuple
 
-from agent import Agent
+from agent import Agent, use_compact_prompts
+from agent_types import StepResult, Task
 
-if TYPE_CHECKING:  # pragma: no cover - typing helpers only
-    from workflow import StepResult, Task
+
+COORDINATOR_PROMPT = (
+    "You are the Coordinator, responsible for facilitating collaboration "
+    "between specialist agents. Provide concise briefings and syntheses in "
+    "clear Markdown."
+)
+# Terse variant selected with ``compact_prompt`` or AUTOMATION_COMPACT_PROMPTS.
+COMPACT_COORDINATOR_PROMPT = (
+    "Coordinator of specialist agents. Reply with concise Markdown "
+    "briefings and syntheses."
+)
 
 
 class CoordinatorAgent(Agent):
     """Provides high-level guidance and synthesises outcomes."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini") -> None:
-        system_prompt = (
-            "You are the Coordinator, responsible for facilitating collaboration "
-            "between specialist agents. Provide concise briefings and syntheses in "
-            "clear Markdown."
-        )
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        compact_prompt: Optional[bool] = None,
+        **agent_options: Any,
+    ) -> None:
+        compact = use_compact_prompts(compact_prompt)
         super().__init__(
             name="Coordinator",
             role="Orchestration lead",
-            system_prompt=system_prompt,
+            system_prompt=COMPACT_COORDINATOR_PROMPT if compact else COORDINATOR_PROMPT,
             api_key=api_key,
             model=model,
+            **agent_options,
         )
 
-    def kickoff_task(self, task: "Task", *, log_file_path: Optional[str] = None) -> str:
+    def _kickoff_request(self, task: Task) -> Tuple[str, str]:
         conversation_id = f"coord::{task.name}"
         message = (
             f"Provide a short kickoff note for the task '{task.name}'.\n"
@@ -35,19 +48,15 @@ class CoordinatorAgent(Agent):
             f"Context: {task.context or 'N/A'}\n"
             "State the initial focus areas in Markdown bullet points."
         )
-        response = self.generate_response(conversation_id, message)
-        self.log(response, log_file_path)
-        return response
+        return conversation_id, message
 
-    def synthesise_outcome(
+    def _synthesis_request(
         self,
-        task: "Task",
+        task: Task,
         plan: dict,
-        results: Iterable["StepResult"],
+        results: Iterable[StepResult],
         reviewer_summary: dict,
-        *,
-        log_file_path: Optional[str] = None,
-    ) -> str:
+    ) -> Tuple[str, str]:
         conversation_id = f"coord-summary::{task.name}"
         timeline = "\n".join(
             f"- {result.step_id}: {result.output.get('summary', 'No summary available')}"
@@ -61,6 +70,64 @@ class CoordinatorAgent(Agent):
             f"Reviewer verdict: {reviewer_summary.get('feedback', 'N/A')}\n"
             "Highlight completed deliverables and recommended next actions."
         )
-        response = self.generate_response(conversation_id, message)
-        self.log(response, log_file_path)
+        return conversation_id, message
+
+    def kickoff_task(
+        self,
+        task: Task,
+        *,
+        stream: bool = True,
+        log_file_path: Optional[str] = None,
+    ) -> str:
+        """Brief ``task``; ``stream`` echoes the note as it is generated.
+
+        Pass ``stream=False`` while other tasks are printing: the note is then
+        echoed in one piece under its header so concurrent output stays legible.
+        """
+
+        conversation_id, message = self._kickoff_request(task)
+        response = self.generate_response(conversation_id, message, stream=stream)
+        self.log(response, log_file_path, echo=not stream)
+        return response
+
+    async def akickoff_task(
+        self,
+        task: Task,
+        *,
+        stream: bool = True,
+        log_file_path: Optional[str] = None,
+    ) -> str:
+        conversation_id, message = self._kickoff_request(task)
+        response = await self.agenerate_response(conversation_id, message, stream=stream)
+        self.log(response, log_file_path, echo=not stream)
+        return response
+
+    def synthesise_outcome(
+        self,
+        task: Task,
+        plan: dict,
+        results: Iterable[StepResult],
+        reviewer_summary: dict,
+        *,
+        stream: bool = True,
+        log_file_path: Optional[str] = None,
+    ) -> str:
+        conversation_id, message = self._synthesis_request(task, plan, results, reviewer_summary)
+        response = self.generate_response(conversation_id, message, stream=stream)
+        self.log(response, log_file_path, echo=not stream)
+        return response
+
+    async def asynthesise_outcome(
+        self,
+        task: Task,
+        plan: dict,
+        results: Iterable[StepResult],
+        reviewer_summary: dict,
+        *,
+        stream: bool = True,
+        log_file_path: Optional[str] = None,
+    ) -> str:
+        conversation_id, message = self._synthesis_request(task, plan, results, reviewer_summary)
+        response = await self.agenerate_response(conversation_id, message, stream=stream)
+        self.log(response, log_file_path, echo=not stream)
         return response
@@ -2,18 +2,39 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from agent import Agent
+from agent import Agent, use_compact_prompts
+from agent_types import StepResult, Task
 from skills import SkillRegistry
+from utils import compact_json, json_loads
 
-if TYPE_CHECKING:  # pragma: no cover - import for typing only
-    from workflow import StepResult, Task
+
+EXECUTOR_PROMPT = (
+    "You are the Executor, a doer who converts plans into tangible results. "
+    "You may call external skills to speed up execution. When responding, "
+    "use JSON with keys: 'summary', 'artifacts' (array of strings), "
+    "'actions' (optional array of objects with 'skill' and 'arguments'), and "
+    "'notes'. Request every independent skill call you need in a single "
+    "'actions' array; they run together and all results come back in one "
+    "message. If you no longer need to call a skill, omit the 'actions' key."
+)
+# Terse variant selected with ``compact_prompt`` or AUTOMATION_COMPACT_PROMPTS.
+COMPACT_EXECUTOR_PROMPT = (
+    "Executor. Output JSON: summary, artifacts[str], notes, optional "
+    "actions[{skill,arguments}]. Batch independent skill calls in one "
+    "actions array; omit actions when done."
+)
 
 
 class ExecutorAgent(Agent):
-    """Executes the planner's steps while leveraging registered skills."""
+    """Executes the planner's steps while leveraging registered skills.
+
+    ``max_skill_invocations`` bounds the number of skill rounds per step; a
+    single round may run several skills requested together.
+    """
 
     def __init__(
         self,
@@ -22,84 +43,322 @@ class ExecutorAgent(Agent):
         api_key: Optional[str] = None,
         model: str = "gpt-4o-mini",
         max_skill_invocations: int = 3,
+        compact_prompt: Optional[bool] = None,
+        **agent_options: Any,
     ) -> None:
-        system_prompt = (
-            "You are the Executor, a doer who converts plans into tangible results. "
-            "You may call external skills to speed up execution. When responding, "
-            "use JSON with keys: 'summary', 'artifacts' (array of strings), "
-            "'action' (optional object with 'skill' and 'arguments'), and "
-            "'notes'. If you no longer need to call a skill, omit the 'action' key."
-        )
+        compact = use_compact_prompts(compact_prompt)
         super().__init__(
             name="Executor",
             role="Implementation specialist",
-            system_prompt=system_prompt,
+            system_prompt=COMPACT_EXECUTOR_PROMPT if compact else EXECUTOR_PROMPT,
             api_key=api_key,
             model=model,
+            **agent_options,
         )
         self.skill_registry = skill_registry
         self.max_skill_invocations = max_skill_invocations
 
-    def _summarise_previous_results(self, results: Iterable["StepResult"]) -> str:
-        summaries: List[str] = []
-        for result in results:
-            summaries.append(
-                f"- {result.step_id}: {result.output.get('summary', 'No summary provided')}"
-            )
+    @staticmethod
+    def progress_line(result: StepResult) -> str:
+        """Render one approved step for the "Progress so far" section.
+
+        Callers that keep their own running progress text build it from these
+        lines and pass it as ``progress`` instead of re-rendering every step.
+        """
+
+        return f"- {result.step_id}: {result.output.get('summary', 'No summary provided')}"
+
+    def _summarise_previous_results(
+        self,
+        results: Iterable[StepResult],
+        progress: Optional[str] = None,
+    ) -> str:
+        if progress:
+            return progress
+        summaries = [self.progress_line(result) for result in results]
         return "\n".join(summaries) if summaries else "None yet."
 
-    def execute_step(
+    def _task_preamble(self, task: Task) -> str:
+        # Task-level content leads the message so every step of a task shares
+        # the same prompt prefix and benefits from provider-side prompt caching.
+        preamble = (
+            f"Available skills:\n{self.skill_registry.to_prompt_fragment()}\n"
+            f"Task objective: {task.objective}\n"
+        )
+        if task.deliverable:
+            preamble += f"Target deliverable: {task.deliverable}\n"
+        return preamble
+
+    def _step_request(
         self,
-        task: "Task",
+        task: Task,
         step: Dict[str, Any],
-        *,
-        prior_results: Iterable["StepResult"],
-        feedback: Optional[str] = None,
-        log_file_path: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        prior_results: Iterable[StepResult],
+        feedback: Optional[str],
+        progress: Optional[str] = None,
+    ) -> Tuple[str, str]:
         conversation_id = f"execute::{task.name}::{step.get('id', 'unknown')}"
-        base_message = (
-            f"Task objective: {task.objective}\n"
-            f"Current step: {json.dumps(step, indent=2)}\n"
-            f"Progress so far:\n{self._summarise_previous_results(prior_results)}\n"
-            f"Available skills:\n{self.skill_registry.to_prompt_fragment()}\n"
+        base_message = self._task_preamble(task) + (
+            f"Current step: {compact_json(step)}\n"
+            f"Progress so far:\n{self._summarise_previous_results(prior_results, progress)}\n"
             "Respond in JSON as documented."
         )
-        if task.deliverable:
-            base_message += f"\nTarget deliverable: {task.deliverable}"
         if feedback:
             base_message += f"\nIncorporate reviewer feedback: {feedback}"
+        return conversation_id, base_message
+
+    def _steps_batch_request(
+        self,
+        task: Task,
+        steps: Sequence[Dict[str, Any]],
+        prior_results: Iterable[StepResult],
+        progress: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        step_ids = "+".join(str(step.get("id", "unknown")) for step in steps)
+        conversation_id = f"execute-batch::{task.name}::{step_ids}"
+        message = self._task_preamble(task) + (
+            f"Current steps (independent of each other): {compact_json(list(steps))}\n"
+            f"Progress so far:\n{self._summarise_previous_results(prior_results, progress)}\n"
+            "Respond in JSON with a 'results' array holding one object per step, "
+            "in the same order, each with 'step_id' and the documented keys. If a "
+            "step needs skills, list them in its 'actions' and that step will be "
+            "executed on its own."
+        )
+        return conversation_id, message
+
+    def _parse_steps_batch(
+        self,
+        steps: Sequence[Dict[str, Any]],
+        response: str,
+        log_file_path: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        parsed_response = json_loads(response)
+        self.log(parsed_response, log_file_path)
+        outputs = parsed_response.get("results") if isinstance(parsed_response, dict) else None
+        if (
+            not isinstance(outputs, list)
+            or len(outputs) != len(steps)
+            or not all(isinstance(output, dict) for output in outputs)
+        ):
+            raise ValueError(f"Executor did not return {len(steps)} results for the batched steps.")
+        if not any("step_id" in output for output in outputs):
+            return outputs
+
+        # Results are labelled, so match them to steps by id rather than trusting
+        # their order; a mislabelled batch falls back to per-step execution.
+        step_ids = [str(step.get("id", "unknown")) for step in steps]
+        by_id = {str(output.get("step_id")): output for output in outputs}
+        if len(set(step_ids)) != len(steps) or set(by_id) != set(step_ids):
+            raise ValueError("Executor results do not match the ids of the batched steps.")
+        return [by_id[step_id] for step_id in step_ids]
+
+    def execute_steps_batch(
+        self,
+        task: Task,
+        steps: Sequence[Dict[str, Any]],
+        *,
+        prior_results: Iterable[StepResult],
+        progress: Optional[str] = None,
+        log_file_path: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Execute several independent ``steps`` with one request.
+
+        Returns one output per step, in order, matched by ``step_id`` when the
+        results carry one. Steps whose result asks for skills are re-run through
+        :meth:`execute_step` so the skill loop applies. Raises ``ValueError``
+        when the response does not match the steps.
+        """
+
+        prior_results = list(prior_results)
+        conversation_id, message = self._steps_batch_request(task, steps, prior_results, progress)
+        response = self.generate_response(
+            conversation_id,
+            message,
+            response_format={"type": "json_object"},
+        )
+        outputs = self._parse_steps_batch(steps, response, log_file_path)
+        for index, (step, output) in enumerate(zip(steps, outputs)):
+            if self._requested_actions(output):
+                outputs[index] = self.execute_step(
+                    task,
+                    step,
+                    prior_results=prior_results,
+                    progress=progress,
+                    log_file_path=log_file_path,
+                )
+        return outputs
+
+    async def aexecute_steps_batch(
+        self,
+        task: Task,
+        steps: Sequence[Dict[str, Any]],
+        *,
+        prior_results: Iterable[StepResult],
+        progress: Optional[str] = None,
+        log_file_path: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Asynchronous counterpart of :meth:`execute_steps_batch`."""
+
+        prior_results = list(prior_results)
+        conversation_id, message = self._steps_batch_request(task, steps, prior_results, progress)
+        response = await self.agenerate_response(
+            conversation_id,
+            message,
+            response_format={"type": "json_object"},
+        )
+        outputs = self._parse_steps_batch(steps, response, log_file_path)
+        rerun = [index for index, output in enumerate(outputs) if self._requested_actions(output)]
+        rerun_outputs = await asyncio.gather(
+            *(
+                self.aexecute_step(
+                    task,
+                    steps[index],
+                    prior_results=prior_results,
+                    progress=progress,
+                    log_file_path=log_file_path,
+                )
+                for index in rerun
+            )
+        )
+        for index, output in zip(rerun, rerun_outputs):
+            outputs[index] = output
+        return outputs
+
+    @staticmethod
+    def _requested_actions(parsed_response: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        actions = parsed_response.get("actions")
+        if not isinstance(actions, list):
+            # Accept the legacy single 'action' object as a one-element batch.
+            action = parsed_response.get("action")
+            actions = [action] if action else []
+
+        requested: List[Tuple[str, Dict[str, Any]]] = []
+        for action in actions:
+            if isinstance(action, dict) and action.get("skill"):
+                requested.append((action["skill"], action.get("arguments", {})))
+        return requested
 
-        pending_message = base_message
-        invocations = 0
+    @staticmethod
+    def _describe_skill_failure(skill_name: str, exc: Exception) -> str:
+        return (
+            f"Skill `{skill_name}` raised an exception: {exc}.\n"
+            "Re-evaluate and either fix the request or continue without the skill."
+        )
+
+    @staticmethod
+    def _describe_skill_result(skill_name: str, arguments: Dict[str, Any], skill_output: str) -> str:
+        return (
+            f"Skill `{skill_name}` executed successfully with arguments {arguments}.\n"
+            f"Result:\n{skill_output}"
+        )
+
+    def _run_skill(self, skill_name: str, arguments: Dict[str, Any]) -> str:
+        """Execute ``skill_name`` and describe the outcome for the model."""
+
+        try:
+            skill_output = self.skill_registry.execute(skill_name, **arguments)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            return self._describe_skill_failure(skill_name, exc)
+        return self._describe_skill_result(skill_name, arguments, skill_output)
+
+    async def _arun_skill(self, skill_name: str, arguments: Dict[str, Any]) -> str:
+        """Asynchronous counterpart of :meth:`_run_skill`."""
+
+        try:
+            skill_output = await self.skill_registry.aexecute(skill_name, **arguments)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            return self._describe_skill_failure(skill_name, exc)
+        return self._describe_skill_result(skill_name, arguments, skill_output)
+
+    def _skill_feedback(self, outcomes: List[str]) -> str:
+        return (
+            "\n\n".join(outcomes)
+            + "\nProvide an updated JSON response. If further tooling is required, "
+            "specify more actions; otherwise omit the actions field."
+        )
+
+    def _run_actions(self, actions: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Execute ``actions`` concurrently and return one follow-up message."""
+
+        if len(actions) == 1:
+            outcomes = [self._run_skill(*actions[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(actions)) as pool:
+                outcomes = list(pool.map(lambda action: self._run_skill(*action), actions))
+        return self._skill_feedback(outcomes)
+
+    async def _arun_actions(self, actions: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Run ``actions`` concurrently off the event loop and return one follow-up."""
+
+        outcomes = await asyncio.gather(*(self._arun_skill(*action) for action in actions))
+        return self._skill_feedback(list(outcomes))
+
+    def execute_step(
+        self,
+        task: Task,
+        step: Dict[str, Any],
+        *,
+        prior_results: Iterable[StepResult],
+        feedback: Optional[str] = None,
+        progress: Optional[str] = None,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Execute ``step``, running any skills it requests, and return its output.
+
+        ``progress`` is the rendered progress text for ``prior_results`` when
+        the caller maintains it incrementally (see :meth:`progress_line`).
+        """
+
+        conversation_id, pending_message = self._step_request(
+            task, step, prior_results, feedback, progress
+        )
+        rounds = 0
         while True:
             response = self.generate_response(
                 conversation_id,
                 pending_message,
                 response_format={"type": "json_object"},
             )
-            self.log(response, log_file_path)
-            parsed_response = json.loads(response)
-
-            action = parsed_response.get("action") or {}
-            skill_name = action.get("skill") if isinstance(action, dict) else None
-            if skill_name and invocations < self.max_skill_invocations:
-                arguments = action.get("arguments", {}) if isinstance(action, dict) else {}
-                try:
-                    skill_output = self.skill_registry.execute(skill_name, **arguments)
-                    feedback_message = (
-                        f"Skill `{skill_name}` executed successfully with arguments {arguments}.\n"
-                        f"Result:\n{skill_output}\n"
-                        "Provide an updated JSON response. If further tooling is required, "
-                        "specify another action; otherwise omit the action field."
-                    )
-                except Exception as exc:  # pragma: no cover - defensive logging
-                    feedback_message = (
-                        f"Skill `{skill_name}` raised an exception: {exc}.\n"
-                        "Re-evaluate and either fix the request or continue without the skill."
-                    )
-                invocations += 1
-                pending_message = feedback_message
+            parsed_response = json_loads(response)
+            self.log(parsed_response, log_file_path)
+
+            actions = self._requested_actions(parsed_response)
+            if actions and rounds < self.max_skill_invocations:
+                pending_message = self._run_actions(actions)
+                rounds += 1
+                continue
+
+            return parsed_response
+
+    async def aexecute_step(
+        self,
+        task: Task,
+        step: Dict[str, Any],
+        *,
+        prior_results: Iterable[StepResult],
+        feedback: Optional[str] = None,
+        progress: Optional[str] = None,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Asynchronous counterpart of :meth:`execute_step`."""
+
+        conversation_id, pending_message = self._step_request(
+            task, step, prior_results, feedback, progress
+        )
+        rounds = 0
+        while True:
+            response = await self.agenerate_response(
+                conversation_id,
+                pending_message,
+                response_format={"type": "json_object"},
+            )
+            parsed_response = json_loads(response)
+            self.log(parsed_response, log_file_path)
+
+            actions = self._requested_actions(parsed_response)
+            if actions and rounds < self.max_skill_invocations:
+                pending_message = await self._arun_actions(actions)
+                rounds += 1
                 continue
 
             return parsed_response
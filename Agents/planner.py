@@ -2,60 +2,79 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from agent import Agent
+from agent import Agent, use_compact_prompts
+from agent_types import Task
+from utils import compact_json, json_loads
 
-if TYPE_CHECKING:  # pragma: no cover - imported for typing only
-    from workflow import Task
+
+PLANNER_PROMPT = (
+    "You are the Planner, an expert workflow designer that specialises in "
+    "breaking down complex objectives into concrete, automation-friendly "
+    "steps. Your plans must be explicit, justified, and resilient to "
+    "ambiguity. Output valid JSON with a top-level object containing the "
+    "keys: 'plan_overview', 'assumptions', and 'steps'. Each item in the "
+    "'steps' array must include 'id', 'description', 'rationale', and "
+    "'success_criteria'. Prefer short identifiers such as 'step-1'. A step "
+    "may list the ids of steps it builds on in 'depends_on', or an empty list "
+    "if it needs none; a step without 'depends_on' follows the step before "
+    "it. Steps without shared dependencies run in parallel."
+)
+# Terse variant selected with ``compact_prompt`` or AUTOMATION_COMPACT_PROMPTS.
+COMPACT_PLANNER_PROMPT = (
+    "Planner. Output JSON: plan_overview, assumptions, "
+    "steps[id,description,rationale,success_criteria,depends_on?]. Use ids like step-1. "
+    "Omitted depends_on means after the previous step; [] means independent."
+)
 
 
 class PlannerAgent(Agent):
     """Creates high-level strategies for automation tasks."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini") -> None:
-        system_prompt = (
-            "You are the Planner, an expert workflow designer that specialises in "
-            "breaking down complex objectives into concrete, automation-friendly "
-            "steps. Your plans must be explicit, justified, and resilient to "
-            "ambiguity. Output valid JSON with a top-level object containing the "
-            "keys: 'plan_overview', 'assumptions', and 'steps'. Each item in the "
-            "'steps' array must include 'id', 'description', 'rationale', and "
-            "'success_criteria'. Prefer short identifiers such as 'step-1'."
-        )
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        compact_prompt: Optional[bool] = None,
+        **agent_options: Any,
+    ) -> None:
+        compact = use_compact_prompts(compact_prompt)
         super().__init__(
             name="Planner",
             role="Workflow strategist",
-            system_prompt=system_prompt,
+            system_prompt=COMPACT_PLANNER_PROMPT if compact else PLANNER_PROMPT,
             api_key=api_key,
             model=model,
+            **agent_options,
         )
 
-    def propose_plan(
-        self,
-        task: "Task",
-        *,
-        feedback: Optional[str] = None,
-        previous_plan: Optional[Dict[str, Any]] = None,
-        log_file_path: Optional[str] = None,
-    ) -> Dict[str, Any]:
-        """Generate a plan for ``task`` incorporating ``feedback`` if provided."""
-
-        conversation_id = f"plan::{task.name}"
-        user_message = (
+    @staticmethod
+    def _describe_task(task: Task) -> str:
+        description = (
             f"Task name: {task.name}\n"
             f"Objective: {task.objective}\n"
             f"Context: {task.context or 'N/A'}\n"
         )
         if task.constraints:
-            user_message += "Constraints:\n" + "\n".join(f"- {item}" for item in task.constraints) + "\n"
+            description += "Constraints:\n" + "\n".join(f"- {item}" for item in task.constraints) + "\n"
         if task.deliverable:
-            user_message += f"Deliverable expectation: {task.deliverable}\n"
+            description += f"Deliverable expectation: {task.deliverable}\n"
+        return description
+
+    def _plan_request(
+        self,
+        task: Task,
+        *,
+        feedback: Optional[str],
+        previous_plan: Optional[Dict[str, Any]],
+    ) -> Tuple[str, str]:
+        conversation_id = f"plan::{task.name}"
+        user_message = self._describe_task(task)
         if previous_plan:
             user_message += (
                 "\nHere is the previous plan attempt that requires revision:\n"
-                f"{json.dumps(previous_plan, indent=2)}\n"
+                f"{compact_json(previous_plan)}\n"
             )
         if feedback:
             user_message += f"\nReviewer feedback to address:\n{feedback}\n"
@@ -64,11 +83,163 @@ class PlannerAgent(Agent):
             "\nRespond strictly in JSON. Ensure the steps are ordered and ready for "
             "automation without manual glue code."
         )
+        return conversation_id, user_message
+
+    def propose_plan(
+        self,
+        task: Task,
+        *,
+        feedback: Optional[str] = None,
+        previous_plan: Optional[Dict[str, Any]] = None,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Generate a plan for ``task`` incorporating ``feedback`` if provided."""
 
+        conversation_id, user_message = self._plan_request(
+            task, feedback=feedback, previous_plan=previous_plan
+        )
         response = self.generate_response(
             conversation_id,
             user_message,
             response_format={"type": "json_object"},
+            # Opening plans for near-identical tasks are safe to share.
+            semantic=True,
+        )
+        parsed_response = json_loads(response)
+        self.log(parsed_response, log_file_path)
+        return parsed_response
+
+    async def apropose_plan(
+        self,
+        task: Task,
+        *,
+        feedback: Optional[str] = None,
+        previous_plan: Optional[Dict[str, Any]] = None,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Asynchronous counterpart of :meth:`propose_plan`."""
+
+        conversation_id, user_message = self._plan_request(
+            task, feedback=feedback, previous_plan=previous_plan
+        )
+        response = await self.agenerate_response(
+            conversation_id,
+            user_message,
+            response_format={"type": "json_object"},
+            semantic=True,
+        )
+        parsed_response = json_loads(response)
+        self.log(parsed_response, log_file_path)
+        return parsed_response
+
+    def _plans_batch_request(self, tasks: Sequence[Task]) -> Tuple[str, str]:
+        conversation_id = "plan-batch::" + "::".join(task.name for task in tasks)
+        sections = "\n".join(
+            f"Task {number}:\n{self._describe_task(task)}"
+            for number, task in enumerate(tasks, start=1)
+        )
+        user_message = (
+            "Plan each of the following tasks independently.\n\n"
+            f"{sections}\n"
+            "Respond strictly in JSON with a single key 'plans' holding an array of "
+            f"exactly {len(tasks)} plan objects in task order, each following the "
+            "documented schema. Ensure the steps are ordered and ready for "
+            "automation without manual glue code."
+        )
+        return conversation_id, user_message
+
+    def _parse_plans_batch(
+        self,
+        tasks: Sequence[Task],
+        response: str,
+        log_file_path: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        parsed_response = json_loads(response)
+        self.log(parsed_response, log_file_path)
+        plans = parsed_response.get("plans") if isinstance(parsed_response, dict) else None
+        if (
+            not isinstance(plans, list)
+            or len(plans) != len(tasks)
+            or not all(isinstance(plan, dict) for plan in plans)
+        ):
+            raise ValueError(f"Planner did not return {len(tasks)} plans for the batched tasks.")
+        return plans
+
+    def propose_plans_batch(
+        self,
+        tasks: Sequence[Task],
+        *,
+        log_file_path: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Plan several ``tasks`` with one request, returning plans in task order.
+
+        Raises ``ValueError`` when the response does not hold one plan per
+        task so callers can fall back to :meth:`propose_plan`.
+        """
+
+        if len(tasks) == 1:
+            return [self.propose_plan(tasks[0], log_file_path=log_file_path)]
+
+        conversation_id, user_message = self._plans_batch_request(tasks)
+        response = self.generate_response(
+            conversation_id,
+            user_message,
+            response_format={"type": "json_object"},
+        )
+        return self._parse_plans_batch(tasks, response, log_file_path)
+
+    async def apropose_plans_batch(
+        self,
+        tasks: Sequence[Task],
+        *,
+        log_file_path: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Asynchronous counterpart of :meth:`propose_plans_batch`."""
+
+        if len(tasks) == 1:
+            return [await self.apropose_plan(tasks[0], log_file_path=log_file_path)]
+
+        conversation_id, user_message = self._plans_batch_request(tasks)
+        response = await self.agenerate_response(
+            conversation_id,
+            user_message,
+            response_format={"type": "json_object"},
+        )
+        return self._parse_plans_batch(tasks, response, log_file_path)
+
+    def render_plan_payload(
+        self,
+        task: Task,
+        *,
+        feedback: Optional[str] = None,
+        previous_plan: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Return the chat completion request :meth:`propose_plan` would send."""
+
+        conversation_id, user_message = self._plan_request(
+            task, feedback=feedback, previous_plan=previous_plan
+        )
+        return self.render_payload(
+            conversation_id,
+            user_message,
+            response_format={"type": "json_object"},
+        )
+
+    def accept_plan(
+        self,
+        task: Task,
+        response: str,
+        *,
+        feedback: Optional[str] = None,
+        previous_plan: Optional[Dict[str, Any]] = None,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Record a plan produced for :meth:`render_plan_payload` and parse it."""
+
+        conversation_id, user_message = self._plan_request(
+            task, feedback=feedback, previous_plan=previous_plan
         )
-        self.log(response, log_file_path)
-        return json.loads(response)
+        self.record_exchange(conversation_id, user_message, response)
+        parsed_response = json_loads(response)
+        self.log(parsed_response, log_file_path)
+        return parsed_response
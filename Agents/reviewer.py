@@ -2,102 +2,202 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Iterable, Optional, TYPE_CHECKING
+from typing import Any, Dict, Iterable, Optional, Tuple
 
-from agent import Agent
+from agent import Agent, use_compact_prompts
+from agent_types import StepResult, Task, encode_step_results
+from utils import compact_json, json_loads
 
-if TYPE_CHECKING:  # pragma: no cover - import for typing only
-    from workflow import StepResult, Task
+
+REVIEWER_PROMPT = (
+    "You are the Reviewer, a meticulous QA specialist. Your job is to "
+    "stress test plans and execution artefacts. Return JSON objects with "
+    "clear approvals, actionable feedback, and a confidence rating."
+)
+# Terse variant selected with ``compact_prompt`` or AUTOMATION_COMPACT_PROMPTS.
+COMPACT_REVIEWER_PROMPT = (
+    "Reviewer. Rigorously QA plans and outputs. Output JSON with approval, "
+    "actionable feedback, confidence."
+)
 
 
 class ReviewerAgent(Agent):
     """Ensures quality control throughout the automation workflow."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini") -> None:
-        system_prompt = (
-            "You are the Reviewer, a meticulous QA specialist. Your job is to "
-            "stress test plans and execution artefacts. Return JSON objects with "
-            "clear approvals, actionable feedback, and a confidence rating."
-        )
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        compact_prompt: Optional[bool] = None,
+        **agent_options: Any,
+    ) -> None:
+        compact = use_compact_prompts(compact_prompt)
         super().__init__(
             name="Reviewer",
             role="Quality assurance lead",
-            system_prompt=system_prompt,
+            system_prompt=COMPACT_REVIEWER_PROMPT if compact else REVIEWER_PROMPT,
             api_key=api_key,
             model=model,
+            **agent_options,
         )
 
-    def review_plan(
-        self,
-        task: "Task",
-        plan: Dict[str, Any],
-        *,
-        iteration: int,
-        log_file_path: Optional[str] = None,
-    ) -> Dict[str, Any]:
+    def _plan_review_request(self, task: Task, plan: Dict[str, Any], iteration: int) -> Tuple[str, str]:
         conversation_id = f"plan-review::{task.name}"
         user_message = (
             f"Task objective: {task.objective}\n"
             f"Review iteration: {iteration}\n"
-            f"Proposed plan:\n{json.dumps(plan, indent=2)}\n"
+            f"Proposed plan:\n{compact_json(plan)}\n"
             "\nRespond in JSON with keys 'approved' (boolean), 'feedback', and "
             "'confidence'. Be candid but constructive."
         )
-        response = self.generate_response(
-            conversation_id,
-            user_message,
-            response_format={"type": "json_object"},
-        )
-        self.log(response, log_file_path)
-        return json.loads(response)
+        return conversation_id, user_message
 
-    def review_step(
+    def _step_review_request(
         self,
-        task: "Task",
+        task: Task,
         step: Dict[str, Any],
         result: Dict[str, Any],
-        *,
         attempt: int,
-        log_file_path: Optional[str] = None,
-    ) -> Dict[str, Any]:
+    ) -> Tuple[str, str]:
         conversation_id = f"step-review::{task.name}::{step.get('id', 'unknown')}"
         user_message = (
             f"Task objective: {task.objective}\n"
-            f"Step metadata: {json.dumps(step, indent=2)}\n"
+            f"Step metadata: {compact_json(step)}\n"
             f"Attempt: {attempt}\n"
-            f"Execution result: {json.dumps(result, indent=2)}\n"
+            f"Execution result: {compact_json(result)}\n"
             "\nProvide a JSON object with keys 'approved' (boolean), 'feedback', "
             "'requires_replan' (boolean), and 'quality' (one of ['high','medium','low'])."
         )
-        response = self.generate_response(
-            conversation_id,
-            user_message,
-            response_format={"type": "json_object"},
-        )
-        self.log(response, log_file_path)
-        return json.loads(response)
+        return conversation_id, user_message
 
-    def final_review(
+    def _final_review_request(
         self,
-        task: "Task",
+        task: Task,
         plan: Dict[str, Any],
-        results: Iterable["StepResult"],
-        *,
-        log_file_path: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        results: Iterable[StepResult],
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, str]:
         conversation_id = f"final-review::{task.name}"
-        serialised_results = [result.to_dict() for result in results]
+        serialised_results = bytearray()
+        encode_step_results(results, serialised_results)
+        execution_stats = f"Execution stats: {compact_json(stats)}\n" if stats else ""
         user_message = (
             f"Task objective: {task.objective}\n"
-            f"Approved plan summary:\n{json.dumps(plan, indent=2)}\n"
-            f"Execution timeline: {json.dumps(serialised_results, indent=2)}\n"
+            f"Approved plan summary:\n{compact_json(plan)}\n"
+            f"Execution timeline: {serialised_results.decode('utf-8')}\n"
+            f"{execution_stats}"
             "\nReturn JSON with keys 'approved', 'feedback', 'highlights', and 'risks'."
         )
+        return conversation_id, user_message
+
+    def _review(self, conversation_id: str, user_message: str, log_file_path: Optional[str]) -> Dict[str, Any]:
         response = self.generate_response(
             conversation_id,
             user_message,
             response_format={"type": "json_object"},
         )
-        self.log(response, log_file_path)
-        return json.loads(response)
+        parsed_response = json_loads(response)
+        self.log(parsed_response, log_file_path)
+        return parsed_response
+
+    async def _areview(
+        self,
+        conversation_id: str,
+        user_message: str,
+        log_file_path: Optional[str],
+    ) -> Dict[str, Any]:
+        response = await self.agenerate_response(
+            conversation_id,
+            user_message,
+            response_format={"type": "json_object"},
+        )
+        parsed_response = json_loads(response)
+        self.log(parsed_response, log_file_path)
+        return parsed_response
+
+    def review_plan(
+        self,
+        task: Task,
+        plan: Dict[str, Any],
+        *,
+        iteration: int,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        conversation_id, user_message = self._plan_review_request(task, plan, iteration)
+        return self._review(conversation_id, user_message, log_file_path)
+
+    async def areview_plan(
+        self,
+        task: Task,
+        plan: Dict[str, Any],
+        *,
+        iteration: int,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        conversation_id, user_message = self._plan_review_request(task, plan, iteration)
+        return await self._areview(conversation_id, user_message, log_file_path)
+
+    @staticmethod
+    def normalise_step_review(review: Dict[str, Any]) -> Dict[str, Any]:
+        """Guarantee the keys the workflow reads from every step review.
+
+        ``approved``, ``requires_replan`` and ``feedback`` are always present
+        afterwards (``False``, ``False`` and ``None`` when missing), so callers
+        can index the review directly. ``review`` is updated in place.
+        """
+
+        review.setdefault("approved", False)
+        review.setdefault("requires_replan", False)
+        review.setdefault("feedback", None)
+        return review
+
+    def review_step(
+        self,
+        task: Task,
+        step: Dict[str, Any],
+        result: Dict[str, Any],
+        *,
+        attempt: int,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        conversation_id, user_message = self._step_review_request(task, step, result, attempt)
+        return self.normalise_step_review(self._review(conversation_id, user_message, log_file_path))
+
+    async def areview_step(
+        self,
+        task: Task,
+        step: Dict[str, Any],
+        result: Dict[str, Any],
+        *,
+        attempt: int,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        conversation_id, user_message = self._step_review_request(task, step, result, attempt)
+        review = await self._areview(conversation_id, user_message, log_file_path)
+        return self.normalise_step_review(review)
+
+    def final_review(
+        self,
+        task: Task,
+        plan: Dict[str, Any],
+        results: Iterable[StepResult],
+        *,
+        stats: Optional[Dict[str, Any]] = None,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Review the whole run; ``stats`` are aggregate attempt counts to cite."""
+
+        conversation_id, user_message = self._final_review_request(task, plan, results, stats)
+        return self._review(conversation_id, user_message, log_file_path)
+
+    async def afinal_review(
+        self,
+        task: Task,
+        plan: Dict[str, Any],
+        results: Iterable[StepResult],
+        *,
+        stats: Optional[Dict[str, Any]] = None,
+        log_file_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        conversation_id, user_message = self._final_review_request(task, plan, results, stats)
+        return await self._areview(conversation_id, user_message, log_file_path)
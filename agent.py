@@ -2,12 +2,81 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import pickle
+import random
+import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, TYPE_CHECKING, Tuple, Union
 
-from openai import OpenAI
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, OpenAI, RateLimitError
 
-from utils import print_agent_output
+from cache import (
+    CacheBackend,
+    JsonFileCache,
+    MemoryCache,
+    SemanticCache,
+    SemanticLookup,
+    cache_key,
+)
+from utils import AgentStreamPrinter, print_agent_output
+
+if TYPE_CHECKING:  # pragma: no cover - typing helpers only
+    import httpx
+
+try:  # pragma: no cover - optional dependency
+    import tiktoken
+except ImportError:  # pragma: no cover - fall back to a character heuristic
+    tiktoken = None
+
+# Approximate per-message framing overhead added by the chat format.
+_MESSAGE_TOKEN_OVERHEAD = 4
+_OMITTED_TURNS_NOTE = "[earlier turns omitted]"
+# Environment variable that switches agents to their terse system prompts.
+COMPACT_PROMPTS_ENV = "AUTOMATION_COMPACT_PROMPTS"
+
+
+@lru_cache(maxsize=None)
+def _encoding_for_model(model: str) -> Any:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: Optional[str], model: str) -> int:
+    """Count the tokens ``text`` costs for ``model``.
+
+    Uses ``tiktoken`` when installed and otherwise estimates roughly four
+    characters per token.
+    """
+
+    if not text:
+        return 0
+    if tiktoken is None:
+        return len(text) // 4 + 1
+    return len(_encoding_for_model(model).encode(text))
+
+
+def use_compact_prompts(compact_prompt: Optional[bool] = None) -> bool:
+    """Resolve whether an agent should use its terse system prompt.
+
+    An explicit ``compact_prompt`` wins; otherwise the
+    ``AUTOMATION_COMPACT_PROMPTS`` environment variable decides.
+    """
+
+    if compact_prompt is not None:
+        return compact_prompt
+    return os.getenv(COMPACT_PROMPTS_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+# Failures worth retrying: rate limits, dropped connections and timeouts, and
+# provider-side 5xx errors. Anything else (bad requests, auth) fails fast.
+_TRANSIENT_ERRORS = (APIConnectionError, InternalServerError, RateLimitError)
 
 
 @dataclass
@@ -26,6 +95,40 @@ class Agent:
     maintain multiple concurrent conversations that are keyed by a
     ``conversation_id``. Conversations automatically include the agent's system
     prompt as the leading message to keep interactions consistent.
+
+    Responses are cached by the exact request payload. Identical requests are
+    answered from a bounded in-memory LRU cache and, when ``cache_path`` or
+    ``persistent_cache`` is provided, from a persistent backend shared across
+    runs. An optional ``semantic_cache`` additionally answers opening turns
+    whose prompt is near-identical to one seen before, for calls that opt in
+    with ``semantic=True``. Only opt in where a near match is a safe answer
+    (e.g. an initial plan), never for verdicts or step outputs whose prompts
+    differ only in a small step-specific part.
+
+    Each conversation is kept within ``max_history_tokens``: once exceeded, the
+    turns between the system prompt and the ``keep_recent_turns`` most recent
+    messages (at least one) are replaced by a short note. Pass ``None`` to
+    keep everything.
+
+    Pass ``client``/``async_client`` to share one OpenAI client between
+    agents; otherwise a client is built from ``api_key``, optionally on top of
+    a shared ``http_client``/``async_http_client`` connection pool.
+
+    ``system_token_count`` holds the token cost of the system prompt, which is
+    counted once at construction and charged to every conversation's budget.
+
+    Every exchange is recorded per conversation. :meth:`dump_histories`
+    saves those transcripts and :meth:`load_histories` queues them for
+    replay: while a conversation repeats the recorded user turns, the recorded
+    replies are returned without contacting the API.
+
+    Set ``prompt_cache_control`` when talking to an Anthropic-compatible
+    endpoint so the static system prompt is marked as a cacheable prefix.
+
+    Transient API failures that outlast the client's own quick retries are
+    retried up to ``max_retries`` more times, waiting ``retry_base * 2**n``
+    seconds (capped at ``retry_cap``) with +/-50% jitter so concurrent agents
+    do not retry in lockstep.
     """
 
     def __init__(
@@ -35,13 +138,60 @@ class Agent:
         system_prompt: str,
         api_key: Optional[str] = None,
         model: str = "gpt-4o-mini",
+        cache_size: int = 1024,
+        cache_path: Optional[Path | str] = None,
+        persistent_cache: Optional[CacheBackend] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        prompt_cache_control: bool = False,
+        max_history_tokens: Optional[int] = 8000,
+        keep_recent_turns: int = 6,
+        http_client: Optional[httpx.Client] = None,
+        async_http_client: Optional[httpx.AsyncClient] = None,
+        client: Optional[OpenAI] = None,
+        async_client: Optional[AsyncOpenAI] = None,
+        max_retries: int = 3,
+        retry_base: float = 1.0,
+        retry_cap: float = 30.0,
     ) -> None:
         self.name = name
         self.role = role
         self.system_prompt = system_prompt.strip()
         self.model = model
-        self.client: Optional[OpenAI] = OpenAI(api_key=api_key) if api_key else None
+        # The system prompt is resent with every request; count it once here
+        # rather than each time a conversation is seeded.
+        self.system_token_count = count_tokens(self.system_prompt, model)
+        if client is None and api_key:
+            client = OpenAI(api_key=api_key, http_client=http_client)
+        if async_client is None and api_key:
+            async_client = AsyncOpenAI(api_key=api_key, http_client=async_http_client)
+        self.client: Optional[OpenAI] = client
+        self.aclient: Optional[AsyncOpenAI] = async_client
         self.chat_histories: Dict[str, List[Message]] = {}
+        # Wire-format mirror of ``chat_histories`` maintained incrementally so a
+        # request never has to re-serialise the whole transcript.
+        self._serialized_histories: Dict[str, List[Dict[str, Any]]] = {}
+        self._conversation_locks: Dict[str, asyncio.Lock] = {}
+        self._response_cache: Optional[MemoryCache] = (
+            MemoryCache(max_entries=cache_size) if cache_size > 0 else None
+        )
+        if persistent_cache is None and cache_path is not None:
+            persistent_cache = JsonFileCache(cache_path)
+        self._persistent_cache = persistent_cache
+        self.semantic_cache = semantic_cache
+        self.prompt_cache_control = prompt_cache_control
+        if keep_recent_turns < 1:
+            # The newest message is the user turn about to be answered.
+            raise ValueError("keep_recent_turns must be at least 1.")
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self._history_token_counts: Dict[str, int] = {}
+        # (user message, reply) pairs in the order they were exchanged, and the
+        # pairs loaded from a previous run that are still waiting to be replayed.
+        self._transcripts: Dict[str, List[Tuple[str, str]]] = {}
+        self._replay: Dict[str, Deque[Tuple[str, str]]] = {}
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
 
     # ------------------------------------------------------------------
     # Conversation management helpers
@@ -54,6 +204,17 @@ class Agent:
             )
         return self.client
 
+    def _ensure_async_client(self) -> AsyncOpenAI:
+        if not self.aclient:
+            raise RuntimeError(
+                "OpenAI client is not configured. Set the OPENAI_API_KEY environment "
+                "variable or provide an explicit api_key when instantiating the agent."
+            )
+        return self.aclient
+
+    def _conversation_lock(self, conversation_id: str) -> asyncio.Lock:
+        return self._conversation_locks.setdefault(conversation_id, asyncio.Lock())
+
     def get_chat_history(self, conversation_id: str) -> List[Message]:
         """Return the chat history for ``conversation_id``.
 
@@ -65,6 +226,10 @@ class Agent:
             self.chat_histories[conversation_id] = [
                 Message(role="system", content=self.system_prompt)
             ]
+            self._serialized_histories[conversation_id] = [self._serialize_system_prompt()]
+            self._history_token_counts[conversation_id] = (
+                self.system_token_count + _MESSAGE_TOKEN_OVERHEAD
+            )
         return self.chat_histories[conversation_id]
 
     def append_to_history(
@@ -75,40 +240,199 @@ class Agent:
     ) -> None:
         history = self.get_chat_history(conversation_id)
         history.append(Message(role=role, content=content))
+        self._serialized_histories[conversation_id].append({"role": role, "content": content})
+        self._history_token_counts[conversation_id] += self._message_tokens(content)
+        self._prune(conversation_id)
+
+    def _message_tokens(self, content: Optional[str]) -> int:
+        return count_tokens(content, self.model) + _MESSAGE_TOKEN_OVERHEAD
+
+    def _prune(self, conversation_id: str) -> None:
+        """Drop middle turns once the conversation exceeds its token budget."""
+
+        if self.max_history_tokens is None:
+            return
+        if self._history_token_counts[conversation_id] <= self.max_history_tokens:
+            return
+
+        history = self.chat_histories[conversation_id]
+        serialized = self._serialized_histories[conversation_id]
+        keep_from = max(len(history) - self.keep_recent_turns, 1)
+        if keep_from <= 1 or (keep_from == 2 and history[1].content == _OMITTED_TURNS_NOTE):
+            return
+
+        note = Message(role="system", content=_OMITTED_TURNS_NOTE)
+        history[1:keep_from] = [note]
+        serialized[1:keep_from] = [{"role": note.role, "content": note.content}]
+        self._history_token_counts[conversation_id] = sum(
+            self._message_tokens(message.content) for message in history
+        )
 
     def reset_conversation(self, conversation_id: Optional[str] = None) -> None:
         """Reset one conversation or all stored conversations."""
 
         if conversation_id is None:
             self.chat_histories.clear()
+            self._serialized_histories.clear()
+            self._history_token_counts.clear()
+            self._conversation_locks.clear()
             return
 
         self.chat_histories.pop(conversation_id, None)
+        self._serialized_histories.pop(conversation_id, None)
+        self._history_token_counts.pop(conversation_id, None)
+        self._conversation_locks.pop(conversation_id, None)
+
+    def dump_histories(self, path: Path | str) -> None:
+        """Persist every conversation's exchanges for :meth:`load_histories`.
+
+        Recorded turns a resumed run has not reached yet are kept as well.
+        """
+
+        transcripts = {
+            conversation_id: list(turns) for conversation_id, turns in self._transcripts.items()
+        }
+        for conversation_id, pending in self._replay.items():
+            transcripts.setdefault(conversation_id, []).extend(pending)
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_suffix(target.suffix + ".tmp")
+        with open(temp_path, "wb") as handle:
+            pickle.dump(transcripts, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        temp_path.replace(target)
+
+    def load_histories(self, path: Path | str) -> None:
+        """Queue the exchanges written by :meth:`dump_histories` for replay.
+
+        Conversations start empty; each user turn that matches the next
+        recorded one is answered with the recorded reply (see
+        :meth:`generate_response`). Only load files produced by this
+        framework: the format is ``pickle``.
+        """
+
+        with open(path, "rb") as handle:
+            transcripts: Dict[str, List[Tuple[str, str]]] = pickle.load(handle)
+
+        for conversation_id, turns in transcripts.items():
+            self._replay[conversation_id] = deque(turns)
+
+    def _replayed_response(self, conversation_id: str, user_message: str) -> Optional[str]:
+        """Return the recorded reply if ``user_message`` is the next recorded turn."""
+
+        pending = self._replay.get(conversation_id)
+        if not pending:
+            return None
+        recorded_message, recorded_response = pending[0]
+        if recorded_message != user_message:
+            # The conversation diverged from the recorded run; answer it live.
+            del self._replay[conversation_id]
+            return None
+        pending.popleft()
+        return recorded_response
+
+    def _record_turn(self, conversation_id: str, user_message: str, assistant_response: str) -> None:
+        self._transcripts.setdefault(conversation_id, []).append((user_message, assistant_response))
 
     # ------------------------------------------------------------------
     # LLM interaction helpers
     # ------------------------------------------------------------------
-    def _serialize_history(self, history: Iterable[Message]) -> List[Dict[str, str]]:
-        return [{"role": message.role, "content": message.content} for message in history]
+    def _serialize_system_prompt(self) -> Dict[str, Any]:
+        if self.prompt_cache_control:
+            # Anthropic-style prompt caching keys on explicitly marked blocks; the
+            # system prompt never changes so it is the natural cache breakpoint.
+            return {
+                "role": "system",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": self.system_prompt,
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ],
+            }
+        return {"role": "system", "content": self.system_prompt}
 
-    def generate_response(
+    def _lookup_cached_response(self, key: str) -> Optional[str]:
+        if self._response_cache is not None:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                return cached
+        if self._persistent_cache is not None:
+            cached = self._persistent_cache.get(key)
+            if cached is not None:
+                if self._response_cache is not None:
+                    self._response_cache.set(key, cached)
+                return cached
+        return None
+
+    def _store_cached_response(self, key: str, response: str) -> None:
+        if self._response_cache is not None:
+            self._response_cache.set(key, response)
+        if self._persistent_cache is not None:
+            self._persistent_cache.set(key, response)
+
+    async def _astore_cached_response(self, key: str, response: str) -> None:
+        if self._response_cache is not None:
+            self._response_cache.set(key, response)
+        if self._persistent_cache is not None:
+            # Persistent backends write to disk (or the network); keep that off the loop.
+            await asyncio.to_thread(self._persistent_cache.set, key, response)
+
+    def _semantic_lookup(self, request_payload: Dict[str, Any], user_message: str) -> Optional[SemanticLookup]:
+        """Probe the semantic cache for opening turns of low-temperature calls.
+
+        Later turns depend on the whole transcript, so only the first user
+        message of a conversation is matched by similarity.
+        """
+
+        cache = self.semantic_cache
+        if cache is None or request_payload["temperature"] > cache.max_temperature:
+            return None
+        if len(request_payload["messages"]) != 2:
+            return None
+        scope = cache_key(
+            {
+                "model": self.model,
+                "system_prompt": self.system_prompt,
+                "temperature": request_payload["temperature"],
+                "response_format": request_payload.get("response_format"),
+                "max_output_tokens": request_payload.get("max_output_tokens"),
+            }
+        )
+        return cache.lookup(user_message, scope)
+
+    def _prepare_request(
         self,
         conversation_id: str,
         user_message: str,
         *,
-        response_format: Optional[Dict[str, Any]] = None,
-        temperature: float = 0.2,
-        max_output_tokens: Optional[int] = None,
-    ) -> str:
-        """Send ``user_message`` to the configured model and return the response."""
-
-        client = self._ensure_client()
-        history = self.get_chat_history(conversation_id)
+        response_format: Optional[Dict[str, Any]],
+        temperature: float,
+        max_output_tokens: Optional[int],
+    ) -> Dict[str, Any]:
         self.append_to_history(conversation_id, "user", user_message)
 
+        # The serialised history is only appended to once the response arrives,
+        # so it can be sent as-is without copying.
+        return self._build_payload(
+            self._serialized_histories[conversation_id],
+            response_format=response_format,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+        )
+
+    def _build_payload(
+        self,
+        messages: List[Dict[str, Any]],
+        *,
+        response_format: Optional[Dict[str, Any]],
+        temperature: float,
+        max_output_tokens: Optional[int],
+    ) -> Dict[str, Any]:
         request_payload: Dict[str, Any] = {
             "model": self.model,
-            "messages": self._serialize_history(history),
+            "messages": messages,
             "temperature": temperature,
         }
 
@@ -116,19 +440,225 @@ class Agent:
             request_payload["response_format"] = response_format
         if max_output_tokens is not None:
             request_payload["max_output_tokens"] = max_output_tokens
+        return request_payload
+
+    def render_payload(
+        self,
+        conversation_id: str,
+        user_message: str,
+        *,
+        response_format: Optional[Dict[str, Any]] = None,
+        temperature: float = 0.2,
+        max_output_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Return the request :meth:`generate_response` would send, without sending it.
+
+        The conversation is left untouched; pair with :meth:`record_exchange`
+        once the response has been obtained out of band (e.g. a batch job).
+        """
+
+        self.get_chat_history(conversation_id)
+        messages = [
+            *self._serialized_histories[conversation_id],
+            {"role": "user", "content": user_message},
+        ]
+        return self._build_payload(
+            messages,
+            response_format=response_format,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+        )
+
+    def record_exchange(self, conversation_id: str, user_message: str, assistant_response: str) -> None:
+        """Append a user/assistant exchange obtained outside :meth:`generate_response`."""
+
+        self._replayed_response(conversation_id, user_message)  # keeps a replay in step
+        self.append_to_history(conversation_id, "user", user_message)
+        self.append_to_history(conversation_id, "assistant", assistant_response)
+        self._record_turn(conversation_id, user_message, assistant_response)
+
+    def _retry_delay(self, retry: int) -> float:
+        return min(self.retry_base * 2**retry, self.retry_cap) * random.uniform(0.5, 1.5)
+
+    def _create_completion(self, client: OpenAI, **request_payload: Any) -> Any:
+        for retry in range(self.max_retries + 1):
+            try:
+                return client.chat.completions.create(**request_payload)
+            except _TRANSIENT_ERRORS:
+                if retry == self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(retry))
+
+    async def _acreate_completion(self, client: AsyncOpenAI, **request_payload: Any) -> Any:
+        for retry in range(self.max_retries + 1):
+            try:
+                return await client.chat.completions.create(**request_payload)
+            except _TRANSIENT_ERRORS:
+                if retry == self.max_retries:
+                    raise
+                await asyncio.sleep(self._retry_delay(retry))
+
+    def _request_completion(
+        self,
+        request_payload: Dict[str, Any],
+        printer: Optional[AgentStreamPrinter],
+    ) -> Optional[str]:
+        client = self._ensure_client()
+        if printer is None:
+            completion = self._create_completion(client, **request_payload)
+            return completion.choices[0].message.content
+
+        # Only opening the stream is retried; a stream that fails part-way has
+        # already been echoed and is not replayed.
+        for chunk in self._create_completion(client, stream=True, **request_payload):
+            if chunk.choices:
+                printer.feed(chunk.choices[0].delta.content or "")
+        return printer.text
+
+    async def _arequest_completion(
+        self,
+        request_payload: Dict[str, Any],
+        printer: Optional[AgentStreamPrinter],
+    ) -> Optional[str]:
+        client = self._ensure_async_client()
+        if printer is None:
+            completion = await self._acreate_completion(client, **request_payload)
+            return completion.choices[0].message.content
+
+        chunks = await self._acreate_completion(client, stream=True, **request_payload)
+        async for chunk in chunks:
+            if chunk.choices:
+                printer.feed(chunk.choices[0].delta.content or "")
+        return printer.text
+
+    def generate_response(
+        self,
+        conversation_id: str,
+        user_message: str,
+        *,
+        response_format: Optional[Dict[str, Any]] = None,
+        temperature: float = 0.2,
+        max_output_tokens: Optional[int] = None,
+        stream: bool = False,
+        semantic: bool = False,
+    ) -> str:
+        """Send ``user_message`` to the configured model and return the response.
+
+        Turns replayed from :meth:`load_histories` and cached responses for an
+        identical request are returned without contacting the API; with
+        ``semantic`` a near-identical opening turn may be answered from the
+        semantic cache too. With ``stream`` the response is echoed to the
+        terminal as it is generated; reserve it for free-form text since the
+        caller still only sees the complete response.
+        """
+
+        printer = AgentStreamPrinter(self.name) if stream else None
+        streamed = False
+        request_payload = self._prepare_request(
+            conversation_id,
+            user_message,
+            response_format=response_format,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+        )
+
+        key = cache_key(request_payload)
+        assistant_response = self._replayed_response(conversation_id, user_message)
+        if assistant_response is None:
+            assistant_response = self._lookup_cached_response(key)
+        if assistant_response is None:
+            probe = self._semantic_lookup(request_payload, user_message) if semantic else None
+            if probe is not None and probe.response is not None:
+                assistant_response = probe.response
+            else:
+                assistant_response = self._request_completion(request_payload, printer)
+                streamed = printer is not None
+                if assistant_response is not None and probe is not None:
+                    self.semantic_cache.store(probe, assistant_response)
+            if assistant_response is not None:
+                self._store_cached_response(key, assistant_response)
+
+        if printer is not None:
+            if not streamed:
+                printer.feed(assistant_response or "")
+            printer.close()
 
-        completion = client.chat.completions.create(**request_payload)
-        assistant_response = completion.choices[0].message.content
         self.append_to_history(conversation_id, "assistant", assistant_response)
+        self._record_turn(conversation_id, user_message, assistant_response)
         return assistant_response
 
+    async def agenerate_response(
+        self,
+        conversation_id: str,
+        user_message: str,
+        *,
+        response_format: Optional[Dict[str, Any]] = None,
+        temperature: float = 0.2,
+        max_output_tokens: Optional[int] = None,
+        stream: bool = False,
+        semantic: bool = False,
+    ) -> str:
+        """Asynchronous counterpart of :meth:`generate_response`.
+
+        Exchanges within one conversation are serialised by a per-conversation
+        lock so concurrent callers never interleave their history updates.
+        """
+
+        printer = AgentStreamPrinter(self.name) if stream else None
+        streamed = False
+        async with self._conversation_lock(conversation_id):
+            request_payload = self._prepare_request(
+                conversation_id,
+                user_message,
+                response_format=response_format,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+            )
+
+            key = cache_key(request_payload)
+            assistant_response = self._replayed_response(conversation_id, user_message)
+            if assistant_response is None:
+                assistant_response = self._lookup_cached_response(key)
+            if assistant_response is None:
+                probe: Optional[SemanticLookup] = None
+                if semantic and self.semantic_cache is not None:
+                    # Embedding lookups use the synchronous client; keep them off the loop.
+                    probe = await asyncio.to_thread(self._semantic_lookup, request_payload, user_message)
+                if probe is not None and probe.response is not None:
+                    assistant_response = probe.response
+                else:
+                    assistant_response = await self._arequest_completion(request_payload, printer)
+                    streamed = printer is not None
+                    if assistant_response is not None and probe is not None:
+                        self.semantic_cache.store(probe, assistant_response)
+                if assistant_response is not None:
+                    await self._astore_cached_response(key, assistant_response)
+
+            if printer is not None:
+                if not streamed:
+                    printer.feed(assistant_response or "")
+                printer.close()
+
+            self.append_to_history(conversation_id, "assistant", assistant_response)
+            self._record_turn(conversation_id, user_message, assistant_response)
+            return assistant_response
+
     # ------------------------------------------------------------------
     # Presentation helpers
     # ------------------------------------------------------------------
-    def log(self, text: Optional[str], log_file_path: Optional[str]) -> None:
-        """Pretty-print and optionally persist the agent output."""
+    def log(
+        self,
+        payload: Union[str, Dict[str, Any], List[Any], None],
+        log_file_path: Optional[str],
+        *,
+        echo: bool = True,
+    ) -> None:
+        """Pretty-print and optionally persist the agent output.
+
+        ``payload`` may be raw text or an already-parsed JSON response.
+        """
 
-        print_agent_output(self.name, text=text, log_file_path=log_file_path)
+        print_agent_output(self.name, text=payload, log_file_path=log_file_path, echo=echo)
 
 
 __all__ = ["Agent", "Message"]
@@ -0,0 +1,98 @@
+"""Task and step records shared by the agents and the workflow.
+
+Kept free of agent and workflow imports so the agent modules can import them
+directly.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils import json_dumps
+
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    """Represents a user-defined automation task.
+
+    Tasks are immutable, so their serialised form is built once in
+    ``__post_init__`` and shared by every ``to_dict`` call; treat the
+    returned dictionary as read-only.
+    """
+
+    name: str
+    objective: str
+    context: Optional[str] = None
+    deliverable: Optional[str] = None
+    constraints: Optional[List[str]] = None
+    _dict_cache: Dict[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self,
+            "_dict_cache",
+            {
+                "name": self.name,
+                "objective": self.objective,
+                "context": self.context,
+                "deliverable": self.deliverable,
+                "constraints": list(self.constraints or []),
+            },
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._dict_cache
+
+
+@dataclass(slots=True)
+class StepResult:
+    """Captures the outcome of a single execution attempt."""
+
+    step_id: str
+    step: Dict[str, Any]
+    output: Dict[str, Any]
+    review: Dict[str, Any]
+    attempt: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "step_id": self.step_id,
+            "attempt": self.attempt,
+            "step": self.step,
+            "output": self.output,
+            "review": self.review,
+        }
+
+    def encode_json(self, buf: bytearray) -> None:
+        """Append the compact JSON form of :meth:`to_dict` to ``buf``.
+
+        Each field is encoded straight into ``buf``, so serialising a run does
+        not build a throwaway dictionary per attempt.
+        """
+
+        buf += b'{"step_id":'
+        buf += json_dumps(self.step_id)
+        buf += b',"attempt":'
+        buf += json_dumps(self.attempt)
+        buf += b',"step":'
+        buf += json_dumps(self.step)
+        buf += b',"output":'
+        buf += json_dumps(self.output)
+        buf += b',"review":'
+        buf += json_dumps(self.review)
+        buf += b"}"
+
+
+def encode_step_results(results: Iterable[StepResult], buf: bytearray) -> None:
+    """Append ``results`` to ``buf`` as a compact JSON array."""
+
+    buf += b"["
+    for index, result in enumerate(results):
+        if index:
+            buf += b","
+        result.encode_json(buf)
+    buf += b"]"
+
+
+__all__ = ["StepResult", "Task", "encode_step_results"]
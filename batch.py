@@ -0,0 +1,89 @@
+"""Submission helpers for the OpenAI Batch API."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Mapping
+
+from utils import compact_json, json_loads
+
+_CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchRunner:
+    """Runs many chat completion requests as one discounted batch job.
+
+    Batches trade latency (up to ``completion_window``) for roughly half the
+    per-token price, which suits work that is not interactive such as
+    proposing the initial plans for a whole task file.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        poll_interval: float = 30.0,
+        completion_window: str = "24h",
+    ) -> None:
+        self.client = client
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+
+    def run(self, requests: Mapping[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Submit ``requests`` keyed by custom id and wait for their responses.
+
+        Returns the assistant message content for every request that
+        succeeded; failed requests are omitted so callers can fall back to
+        interactive calls for them. Batches that expire or are cancelled keep
+        whatever results they produced, and a batch without an output file
+        yields an empty mapping.
+        """
+
+        if not requests:
+            return {}
+
+        lines = [
+            compact_json(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": _CHAT_COMPLETIONS_ENDPOINT,
+                    "body": payload,
+                }
+            )
+            for custom_id, payload in requests.items()
+        ]
+        input_file = self.client.files.create(
+            file=("batch.jsonl", ("\n".join(lines) + "\n").encode("utf-8")),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=_CHAT_COMPLETIONS_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+
+        while batch.status not in _TERMINAL_STATUSES:
+            time.sleep(self.poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+
+        if not batch.output_file_id:
+            return {}
+
+        responses: Dict[str, str] = {}
+        output = self.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line:
+                continue
+            record = json_loads(line)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+            if content is not None:
+                responses[record["custom_id"]] = content
+        return responses
+
+
+__all__ = ["BatchRunner"]
@@ -0,0 +1,274 @@
+"""Response caches used to avoid repeating identical LLM requests."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Tuple
+
+from agent_types import Task
+from utils import compact_json, json_loads
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - fall back to pure Python maths
+    np = None
+
+
+class CacheBackend(Protocol):
+    """Minimal interface shared by all response cache backends."""
+
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, value: str) -> None:
+        ...
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Return a stable SHA-256 key for a chat completion ``payload``."""
+
+    canonical = compact_json(payload, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """Process-local LRU cache bounded to ``max_entries`` responses."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:  # pragma: no cover - trivial helper
+        return len(self._entries)
+
+
+class JsonFileCache:
+    """Persists responses to a JSON Lines file so they survive between runs.
+
+    The file is read once on construction; each new response is appended as
+    one ``[key, value]`` line, so storing costs O(entry) rather than a rewrite
+    of the whole cache. Later lines win, and an unreadable line (e.g. one cut
+    short by a crash) is skipped. Files holding a single JSON object, as
+    written by earlier versions, are still read.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Appends must start on a fresh line even if the file was cut short.
+        self._needs_newline = False
+        if self.path.exists():
+            data = self.path.read_bytes()
+            self._needs_newline = bool(data) and not data.endswith(b"\n")
+            for line in data.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json_loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    self._entries.update(record)
+                elif isinstance(record, list) and len(record) == 2:
+                    self._entries[record[0]] = record[1]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            if self._entries.get(key) == value:
+                return
+            self._entries[key] = value
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            line = compact_json([key, value]) + "\n"
+            if self._needs_newline:
+                line = "\n" + line
+                self._needs_newline = False
+            with open(self.path, "a", encoding="utf-8") as cache_file:
+                cache_file.write(line)
+
+
+class OpenAIEmbedder:
+    """Embeds text with an OpenAI embedding model for :class:`SemanticCache`."""
+
+    def __init__(self, client: Any, model: str = "text-embedding-3-small") -> None:
+        self.client = client
+        self.model = model
+
+    def __call__(self, text: str) -> Sequence[float]:
+        response = self.client.embeddings.create(model=self.model, input=text)
+        return response.data[0].embedding
+
+
+@dataclass
+class SemanticLookup:
+    """Result of a semantic cache probe, reusable when storing the answer."""
+
+    scope: str
+    embedding: Sequence[float]
+    response: Optional[str] = None
+
+
+def _normalise(vector: Sequence[float]) -> Sequence[float]:
+    if np is not None:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm else array
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else list(vector)
+
+
+class SemanticCache:
+    """Answers prompts whose embeddings are near-identical to a cached prompt.
+
+    Entries are partitioned by ``scope`` (model, system prompt, response
+    format and temperature) so only otherwise-identical requests can match.
+    A lookup returns the cached response when the cosine similarity reaches
+    ``threshold``. Only requests at or below ``max_temperature`` should be
+    routed here since sampling at higher temperatures is intentionally varied.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Sequence[float]],
+        *,
+        threshold: float = 0.92,
+        max_temperature: float = 0.3,
+        max_entries_per_scope: int = 1024,
+    ) -> None:
+        self.embed = embed
+        self.threshold = threshold
+        self.max_temperature = max_temperature
+        self.max_entries_per_scope = max_entries_per_scope
+        self._entries: Dict[str, List[Tuple[Sequence[float], str]]] = {}
+        self._matrices: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, text: str, scope: str) -> SemanticLookup:
+        embedding = _normalise(self.embed(text))
+        result = SemanticLookup(scope=scope, embedding=embedding)
+        with self._lock:
+            entries = self._entries.get(scope)
+            if not entries:
+                return result
+            if np is not None:
+                matrix = self._matrices.get(scope)
+                if matrix is None:
+                    matrix = self._matrices[scope] = np.stack([vector for vector, _ in entries])
+                similarities = matrix @ embedding
+                best = int(np.argmax(similarities))
+                best_similarity = float(similarities[best])
+            else:
+                similarities = [
+                    sum(a * b for a, b in zip(vector, embedding)) for vector, _ in entries
+                ]
+                best = max(range(len(similarities)), key=similarities.__getitem__)
+                best_similarity = similarities[best]
+            if best_similarity >= self.threshold:
+                result.response = entries[best][1]
+        return result
+
+    def store(self, lookup: SemanticLookup, response: str) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(lookup.scope, [])
+            entries.append((lookup.embedding, response))
+            if len(entries) > self.max_entries_per_scope:
+                del entries[0]
+            self._matrices.pop(lookup.scope, None)
+
+
+class PlanCache:
+    """Reuses plans that already carried an equivalent task to completion.
+
+    Tasks are first matched exactly on their objective, context, deliverable
+    and constraints. When ``embed`` is supplied, a task whose description is
+    semantically close (cosine similarity of at least ``threshold``) to an
+    earlier one reuses that plan as well.
+    """
+
+    _SCOPE = "plans"
+
+    def __init__(
+        self,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        *,
+        max_entries: int = 256,
+        threshold: float = 0.92,
+    ) -> None:
+        self._exact = MemoryCache(max_entries=max_entries)
+        self._semantic: Optional[SemanticCache] = (
+            SemanticCache(embed, threshold=threshold, max_entries_per_scope=max_entries)
+            if embed is not None
+            else None
+        )
+
+    @staticmethod
+    def _key(task: Task) -> str:
+        return cache_key(
+            {
+                "objective": task.objective,
+                "context": task.context,
+                "deliverable": task.deliverable,
+                "constraints": task.constraints or [],
+            }
+        )
+
+    @staticmethod
+    def _describe(task: Task) -> str:
+        lines = [task.objective, task.context or "", task.deliverable or ""]
+        lines.extend(task.constraints or [])
+        return "\n".join(lines)
+
+    def lookup(self, task: Task) -> Tuple[Optional[Dict[str, Any]], Optional[SemanticLookup]]:
+        """Return a cached plan for ``task`` (or ``None``) and the probe for :meth:`store`."""
+
+        cached = self._exact.get(self._key(task))
+        if cached is not None:
+            return json_loads(cached), None
+        if self._semantic is None:
+            return None, None
+        probe = self._semantic.lookup(self._describe(task), self._SCOPE)
+        if probe.response is not None:
+            return json_loads(probe.response), None
+        return None, probe
+
+    def store(self, task: Task, plan: Dict[str, Any], probe: Optional[SemanticLookup] = None) -> None:
+        serialized = compact_json(plan)
+        self._exact.set(self._key(task), serialized)
+        if self._semantic is not None and probe is not None:
+            self._semantic.store(probe, serialized)
+
+
+__all__ = [
+    "CacheBackend",
+    "JsonFileCache",
+    "MemoryCache",
+    "OpenAIEmbedder",
+    "PlanCache",
+    "SemanticCache",
+    "SemanticLookup",
+    "cache_key",
+]
@@ -4,25 +4,31 @@ from __future__ import annotations
 
 import argparse
 import ast
-import operator
+import asyncio
+import atexit
+import importlib.util
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Tuple
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
 
 from Agents import CoordinatorAgent, ExecutorAgent, PlannerAgent, ReviewerAgent
+from agent_types import Task
+from cache import JsonFileCache, OpenAIEmbedder, PlanCache, SemanticCache
 from skills import SkillRegistry
-from utils import initialise_log_file
-from workflow import AutomationWorkflow, Task
+from utils import initialise_log_file, json_loads
+from workflow import AutomationWorkflow
 
 
 def load_tasks(task_file: Path) -> List[Task]:
     if not task_file.exists():
         raise FileNotFoundError(f"Task file '{task_file}' does not exist.")
 
-    import json
-
-    raw_tasks = json.loads(task_file.read_text())
+    raw_tasks = json_loads(task_file.read_bytes())
 
     tasks: List[Task] = []
     for item in raw_tasks:
@@ -42,35 +48,42 @@ def build_skill_registry() -> SkillRegistry:
     registry = SkillRegistry()
 
     # A safe arithmetic evaluator inspired by AutoGen's calculator tools.
-    allowed_operators = {
-        ast.Add: operator.add,
-        ast.Sub: operator.sub,
-        ast.Mult: operator.mul,
-        ast.Div: operator.truediv,
-        ast.Pow: operator.pow,
-        ast.Mod: operator.mod,
-    }
+    # Expressions are validated against a whitelist of AST node types, then
+    # compiled and evaluated natively with no builtins in scope.
+    allowed_nodes = frozenset(
+        {
+            ast.Expression,
+            ast.BinOp,
+            ast.UnaryOp,
+            ast.Constant,
+            ast.UAdd,
+            ast.USub,
+            ast.Add,
+            ast.Sub,
+            ast.Mult,
+            ast.Div,
+            ast.Pow,
+            ast.Mod,
+        }
+    )
 
+    @lru_cache(maxsize=1024)
     def evaluate_math(expression: str) -> str:
         """Safely evaluate a simple arithmetic expression."""
 
-        def _eval(node: ast.AST) -> float:
-            if isinstance(node, ast.Expression):
-                return _eval(node.body)
-            if isinstance(node, ast.BinOp) and type(node.op) in allowed_operators:
-                return allowed_operators[type(node.op)](_eval(node.left), _eval(node.right))
-            if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
-                value = _eval(node.operand)
-                return value if isinstance(node.op, ast.UAdd) else -value
-            if isinstance(node, ast.Num):  # pragma: no cover - Python <3.8 compat
-                return float(node.n)
-            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
-                return float(node.value)
-            raise ValueError("Unsupported expression")
-
         tree = ast.parse(expression, mode="eval")
-        result = _eval(tree)
-        return str(result)
+        for node in ast.walk(tree):
+            if type(node) not in allowed_nodes:
+                raise ValueError("Unsupported expression")
+            if type(node) is ast.Constant:
+                if not isinstance(node.value, (int, float)):
+                    raise ValueError("Unsupported expression")
+                # Float operands keep arithmetic in machine floats, which bounds
+                # the cost of inputs such as 9**9**9 (OverflowError, not bigints).
+                node.value = float(node.value)
+
+        code = compile(tree, "<math>", "eval")
+        return str(eval(code, {"__builtins__": {}}, {}))
 
     registry.register(
         "evaluate_math",
@@ -81,6 +94,32 @@ def build_skill_registry() -> SkillRegistry:
     return registry
 
 
+def build_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Create keep-alive connection pools shared by every agent.
+
+    HTTP/2 multiplexing is enabled when the optional ``h2`` package is
+    installed; otherwise the pools fall back to HTTP/1.1 keep-alive.
+    """
+
+    http2 = importlib.util.find_spec("h2") is not None
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    # Mirror the OpenAI SDK defaults: fail fast on connect, allow slow generations.
+    timeout = httpx.Timeout(600.0, connect=10.0)
+    return (
+        httpx.Client(http2=http2, limits=limits, timeout=timeout),
+        httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout),
+    )
+
+
+def positive_int(value: str) -> int:
+    """``argparse`` type for limits that must allow at least one worker."""
+
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def parse_args(argv: Iterable[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run the automation workflow.")
     parser.add_argument(
@@ -100,6 +139,71 @@ def parse_args(argv: Iterable[str]) -> argparse.Namespace:
         default=Path("reports"),
         help="Directory where Markdown reports will be stored.",
     )
+    parser.add_argument(
+        "--json-reports",
+        action="store_true",
+        help="Also write each task report as JSON next to its Markdown report.",
+    )
+    parser.add_argument(
+        "--io-uring-reports",
+        action="store_true",
+        help=(
+            "Batch report writes through io_uring (Linux with liburing 2024.x only; "
+            "warns and writes normally otherwise)."
+        ),
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=None,
+        help="Optional JSON Lines file used to persist LLM responses between runs.",
+    )
+    parser.add_argument(
+        "--semantic-cache",
+        action="store_true",
+        help="Reuse initial plans for near-identical task descriptions using embeddings.",
+    )
+    parser.add_argument(
+        "--max-step-workers",
+        type=positive_int,
+        default=4,
+        help="Maximum number of independent plan steps executed concurrently per task.",
+    )
+    parser.add_argument(
+        "--plan-cache",
+        action="store_true",
+        help=(
+            "Reuse plans that completed an equivalent task earlier in the run "
+            "(matched by embedding too when --semantic-cache is set)."
+        ),
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=positive_int,
+        default=8,
+        help="Maximum number of tasks processed concurrently.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Replay agent replies recorded by a previous run with the same run name.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Propose initial plans through the OpenAI Batch API (cheaper, but may take hours).",
+    )
+    parser.add_argument(
+        "--batch-plan-size",
+        type=int,
+        default=1,
+        help="Propose initial plans for this many tasks per planner request (1 disables batching).",
+    )
+    parser.add_argument(
+        "--compact-prompts",
+        action="store_true",
+        help="Use terse agent system prompts to save tokens (also AUTOMATION_COMPACT_PROMPTS=1).",
+    )
     return parser.parse_args(list(argv))
 
 
@@ -120,10 +224,36 @@ def main(argv: Iterable[str] | None = None) -> None:
     log_file_path = initialise_log_file(args.run_name)
     skill_registry = build_skill_registry()
 
-    planner = PlannerAgent(api_key=api_key)
-    reviewer = ReviewerAgent(api_key=api_key)
-    coordinator = CoordinatorAgent(api_key=api_key)
-    executor = ExecutorAgent(skill_registry, api_key=api_key)
+    http_client, async_http_client = build_http_clients()
+    atexit.register(http_client.close)
+    # One client pair serves every agent so they share connections, keep-alives
+    # and retry configuration.
+    client = OpenAI(api_key=api_key, http_client=http_client)
+    async_client = AsyncOpenAI(api_key=api_key, http_client=async_http_client)
+    agent_options = {
+        "persistent_cache": JsonFileCache(args.cache_file) if args.cache_file else None,
+        "client": client,
+        "async_client": async_client,
+    }
+    if args.compact_prompts:
+        agent_options["compact_prompt"] = True
+    embedder = OpenAIEmbedder(client) if args.semantic_cache else None
+    if embedder is not None:
+        agent_options["semantic_cache"] = SemanticCache(embedder)
+
+    planner = PlannerAgent(api_key=api_key, **agent_options)
+    reviewer = ReviewerAgent(api_key=api_key, **agent_options)
+    coordinator = CoordinatorAgent(api_key=api_key, **agent_options)
+    executor = ExecutorAgent(skill_registry, api_key=api_key, **agent_options)
+
+    # Conversation transcripts are saved on exit. With --resume a rerun replays
+    # the recorded replies instead of calling the API, until a conversation
+    # departs from what was recorded.
+    for agent in (planner, reviewer, coordinator, executor):
+        history_path = Path("logs") / f"{args.run_name}-{agent.name.lower()}-hist.pkl"
+        if args.resume and history_path.exists():
+            agent.load_histories(history_path)
+        atexit.register(agent.dump_histories, history_path)
 
     workflow = AutomationWorkflow(
         planner,
@@ -132,9 +262,22 @@ def main(argv: Iterable[str] | None = None) -> None:
         coordinator=coordinator,
         log_file_path=log_file_path,
         reports_dir=args.reports_dir,
+        max_concurrency=args.max_concurrency,
+        batch_plan_size=args.batch_plan_size,
+        plan_cache=PlanCache(embedder) if args.plan_cache else None,
+        max_step_workers=args.max_step_workers,
+        json_reports=args.json_reports,
+        io_uring_reports=args.io_uring_reports,
     )
+    atexit.register(workflow.close)
+
+    initial_plans = workflow.propose_plans_via_batch_api(tasks) if args.batch else None
+
+    async def _run() -> None:
+        async with async_http_client:
+            await workflow.arun_all(tasks, initial_plans=initial_plans)
 
-    workflow.run_all(tasks)
+    asyncio.run(_run())
     print(f"Completed automation run. Reports saved to {args.reports_dir.resolve()}")
 
 
@@ -0,0 +1,162 @@
+"""Dependency bookkeeping shared by the thread and ``asyncio`` plan runners."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, List, Optional, Set
+
+if TYPE_CHECKING:  # pragma: no cover - annotations only
+    from agent_types import StepResult
+
+
+def step_dependencies(steps: List[Dict[str, Any]]) -> List[Set[int]]:
+    """Map each step position to the positions it waits for.
+
+    Steps may list prerequisite ids in ``depends_on``; an explicit empty list
+    marks a step as independent. A step that omits ``depends_on`` waits for
+    the one before it, so a plan without any dependencies runs its steps in
+    order. The whole plan also runs in order when its step ids repeat or its
+    dependencies name unknown steps or form a cycle.
+    """
+
+    in_order = [{position - 1} if position else set() for position in range(len(steps))]
+    try:
+        positions = {step["id"]: position for position, step in enumerate(steps)}
+        if len(positions) != len(steps):
+            return in_order
+
+        dependencies: List[Set[int]] = []
+        for position, step in enumerate(steps):
+            depends_on = step.get("depends_on")
+            if depends_on is None:
+                dependencies.append(in_order[position])
+                continue
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            dependencies.append({positions[step_id] for step_id in depends_on})
+    except (KeyError, TypeError):  # unknown or unhashable ids, non-list depends_on
+        return in_order
+
+    # Kahn's algorithm: every step must become ready eventually.
+    remaining = [set(deps) for deps in dependencies]
+    ready = [position for position, deps in enumerate(remaining) if not deps]
+    resolved = 0
+    while ready:
+        finished = ready.pop()
+        resolved += 1
+        for position, deps in enumerate(remaining):
+            if finished in deps:
+                deps.discard(finished)
+                if not deps:
+                    ready.append(position)
+    return dependencies if resolved == len(steps) else in_order
+
+
+class StepSchedule:
+    """Tracks which steps of a plan are ready and what they build on.
+
+    The runners only start the calls: they launch each group returned by
+    :meth:`start` and :meth:`finish` with :meth:`context`, and report every
+    finished step back through :meth:`finish`. Steps are referred to by their
+    position in ``steps``.
+
+    Groups hold the steps that wait for exactly the same steps, and a step is
+    shown only the results of the steps it transitively depends on, in plan
+    order. Both are independent of which concurrent step happens to finish
+    first, so an unchanged rerun sends the same requests and can be replayed.
+    """
+
+    def __init__(
+        self,
+        steps: List[Dict[str, Any]],
+        progress_line: Optional[Callable[[StepResult], str]] = None,
+    ) -> None:
+        self.steps = steps
+        self.replan_feedback: Optional[str] = None
+        self._dependencies = step_dependencies(steps)
+        self._waiting_on = [set(depends_on) for depends_on in self._dependencies]
+        self._dependents: List[List[int]] = [[] for _ in steps]
+        for position, depends_on in enumerate(self._dependencies):
+            for dependency in depends_on:
+                self._dependents[dependency].append(position)
+        # Filled in as steps become ready, once their dependencies' are known.
+        self._ancestors: Dict[int, List[int]] = {}
+        self._attempts: Dict[int, List[StepResult]] = {}
+        # Each approved step's progress line is rendered once and reused by
+        # every step that builds on it.
+        self._progress_line = progress_line
+        self._progress_lines: Dict[int, str] = {}
+
+    def _group(self, ready: List[int]) -> List[List[int]]:
+        """Split ``ready`` into groups of steps with the same dependencies."""
+
+        groups: Dict[FrozenSet[int], List[int]] = {}
+        for position in ready:
+            depends_on = frozenset(self._dependencies[position])
+            groups.setdefault(depends_on, []).append(position)
+            ancestors = set(depends_on)
+            for dependency in depends_on:
+                ancestors.update(self._ancestors[dependency])
+            self._ancestors[position] = sorted(ancestors)
+        return list(groups.values())
+
+    def start(self) -> List[List[int]]:
+        """Groups of steps that can run before anything has finished."""
+
+        return self._group(
+            [position for position, depends_on in enumerate(self._waiting_on) if not depends_on]
+        )
+
+    def context(self, group: List[int]) -> Dict[str, Any]:
+        """Keyword arguments describing the work ``group`` builds on for the executor."""
+
+        ancestors = self._ancestors[group[0]]
+        context: Dict[str, Any] = {
+            "prior_results": [self._attempts[position][-1] for position in ancestors]
+        }
+        if self._progress_line is not None and ancestors:
+            context["progress"] = "\n".join(self._progress_lines[position] for position in ancestors)
+        return context
+
+    def finish(
+        self,
+        position: int,
+        step_attempts: List[StepResult],
+        require_replan: bool,
+    ) -> Optional[List[List[int]]]:
+        """Record a finished step and return the groups it makes ready.
+
+        Returns ``None`` when the reviewer asked for a re-plan, leaving its
+        feedback in :attr:`replan_feedback`. Raises ``RuntimeError`` when the
+        step ran out of attempts without being approved.
+        """
+
+        if require_replan:
+            self.replan_feedback = step_attempts[-1].review["feedback"]
+            return None
+
+        if not step_attempts or not step_attempts[-1].review["approved"]:
+            raise RuntimeError(
+                f"Step '{self.steps[position]['id']}' was not approved after "
+                f"{len(step_attempts)} attempts."
+            )
+
+        self._attempts[position] = step_attempts
+        if self._progress_line is not None:
+            self._progress_lines[position] = self._progress_line(step_attempts[-1])
+
+        ready: List[int] = []
+        for dependent in self._dependents[position]:
+            self._waiting_on[dependent].discard(position)
+            if not self._waiting_on[dependent]:
+                ready.append(dependent)
+        return self._group(ready)
+
+    def results(self) -> List[StepResult]:
+        """Every attempt of every step, in plan order."""
+
+        return [
+            result for position in range(len(self.steps)) for result in self._attempts[position]
+        ]
+
+
+__all__ = ["StepSchedule", "step_dependencies"]
@@ -0,0 +1,122 @@
+"""Optional io_uring backend for the background report writer.
+
+Written against the 2024.x releases of the ``liburing`` Python bindings
+(``pip install "liburing>=2024,<2025"``); other releases expose a different
+API and fall back to ordinary writes with a warning.
+"""
+
+from __future__ import annotations
+
+import os
+import platform
+import warnings
+from typing import Dict, Optional, Sequence, Tuple
+
+try:  # pragma: no cover - optional dependency, Linux only
+    import liburing
+except ImportError:  # pragma: no cover - fall back to synchronous writes
+    liburing = None
+
+SUPPORTED_LIBURING = "liburing>=2024,<2025"
+# Bindings used below; later releases renamed or removed some of them.
+_LIBURING_API = (
+    "io_uring",
+    "io_uring_cqes",
+    "iovec",
+    "io_uring_queue_init",
+    "io_uring_queue_exit",
+    "io_uring_get_sqe",
+    "io_uring_prep_write",
+    "io_uring_submit",
+    "io_uring_wait_cqe",
+    "io_uring_cqe_seen",
+)
+
+
+class UringReportWriter:
+    """Writes batches of files with a single ``io_uring`` submission.
+
+    Every write in a batch is queued on the ring and submitted together, so N
+    reports cost one ``io_uring_enter`` call instead of N ``write`` calls.
+    """
+
+    def __init__(self, entries: int = 32) -> None:
+        self.entries = entries
+        self._ring = liburing.io_uring()
+        self._cqes = liburing.io_uring_cqes()
+        liburing.io_uring_queue_init(entries, self._ring, 0)
+        self._closed = False
+
+    def close(self) -> None:
+        """Tear down the ring; the writer must not be used afterwards."""
+
+        if not self._closed:
+            self._closed = True
+            liburing.io_uring_queue_exit(self._ring)
+
+    def write_batch(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        """Replace each file with its data; at most ``entries`` files per call."""
+
+        # A later write to the same path wins, as it would if run in order.
+        latest: Dict[str, bytes] = dict(items)
+        fds: Dict[str, int] = {}
+        try:
+            for path in latest:
+                fds[path] = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+            buffers = []  # keeps the buffers alive until the kernel is done
+            for path, data in latest.items():
+                if not data:
+                    continue
+                buffer = liburing.iovec(bytearray(data))
+                buffers.append(buffer)
+                sqe = liburing.io_uring_get_sqe(self._ring)
+                liburing.io_uring_prep_write(sqe, fds[path], buffer.iov_base, buffer.iov_len, 0)
+
+            if buffers:
+                liburing.io_uring_submit(self._ring)
+                for _ in buffers:
+                    liburing.io_uring_wait_cqe(self._ring, self._cqes)
+                    liburing.io_uring_cqe_seen(self._ring, self._cqes[0])
+
+            # Completions arrive in any order; rather than matching them up,
+            # check each file and finish short or failed writes directly.
+            for path, data in latest.items():
+                fd = fds[path]
+                written = os.fstat(fd).st_size
+                if written != len(data):
+                    os.ftruncate(fd, 0)
+                    os.pwrite(fd, data, 0)
+        finally:
+            for fd in fds.values():
+                os.close(fd)
+
+
+def create_uring_writer(entries: int = 32) -> Optional[UringReportWriter]:
+    """Return an io_uring writer, or ``None`` with a warning where io_uring is unavailable."""
+
+    if platform.system() != "Linux":
+        reason = "io_uring is only available on Linux"
+    elif liburing is None:
+        reason = f"the liburing package is not installed ({SUPPORTED_LIBURING} is supported)"
+    else:
+        missing = [name for name in _LIBURING_API if not hasattr(liburing, name)]
+        if missing:
+            reason = (
+                f"the installed liburing lacks {', '.join(missing)}; "
+                f"install {SUPPORTED_LIBURING}"
+            )
+        else:
+            try:
+                return UringReportWriter(entries)
+            except OSError as exc:  # e.g. kernels without io_uring support
+                reason = f"the io_uring ring could not be set up ({exc})"
+    warnings.warn(
+        f"io_uring report writes are disabled because {reason}; writing reports one at a time.",
+        RuntimeWarning,
+        stacklevel=2,
+    )
+    return None
+
+
+__all__ = ["SUPPORTED_LIBURING", "UringReportWriter", "create_uring_writer"]
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import inspect
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 
 @dataclass
@@ -26,6 +27,10 @@ class SkillRegistry:
 
     def __init__(self) -> None:
         self._skills: Dict[str, Skill] = {}
+        # Both views are rebuilt lazily after the registry changes; skills are
+        # registered up front while the executor reads them on every step.
+        self._prompt_cache: Optional[str] = None
+        self._skills_snapshot: Optional[Tuple[Skill, ...]] = None
 
     def register(self, name: str, function: Callable[..., Any], description: str) -> None:
         if name in self._skills:
@@ -37,6 +42,8 @@ class SkillRegistry:
             function=function,
             signature=signature,
         )
+        self._prompt_cache = None
+        self._skills_snapshot = None
 
     def execute(self, name: str, **kwargs: Any) -> str:
         if name not in self._skills:
@@ -44,18 +51,26 @@ class SkillRegistry:
         skill = self._skills[name]
         return skill.execute(**kwargs)
 
+    async def aexecute(self, name: str, **kwargs: Any) -> str:
+        """Run :meth:`execute` in a worker thread so the event loop stays free."""
+
+        return await asyncio.to_thread(self.execute, name, **kwargs)
+
     def list_skills(self) -> Iterable[Skill]:
-        return self._skills.values()
+        if self._skills_snapshot is None:
+            self._skills_snapshot = tuple(self._skills.values())
+        return self._skills_snapshot
 
     def to_prompt_fragment(self) -> str:
-        if not self._skills:
-            return "No custom skills are registered."
-        lines: List[str] = []
-        for skill in self._skills.values():
-            lines.append(
-                f"- {skill.name}{skill.signature}: {skill.description}"
-            )
-        return "\n".join(lines)
+        if self._prompt_cache is None:
+            if not self._skills:
+                self._prompt_cache = "No custom skills are registered."
+            else:
+                self._prompt_cache = "\n".join(
+                    f"- {skill.name}{skill.signature}: {skill.description}"
+                    for skill in self._skills.values()
+                )
+        return self._prompt_cache
 
     def __len__(self) -> int:  # pragma: no cover - trivial helper
         return len(self._skills)
@@ -0,0 +1,55 @@
+"""Tests for the plan step scheduler."""
+
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+
+from plan_schedule import StepSchedule, step_dependencies
+
+
+def _approved(step_id: str) -> list:
+    return [SimpleNamespace(step_id=step_id, review={"approved": True, "feedback": None})]
+
+
+class StepDependenciesTest(unittest.TestCase):
+    def test_declared_dependencies(self) -> None:
+        steps = [
+            {"id": "a", "depends_on": []},
+            {"id": "b", "depends_on": ["a"]},
+            {"id": "c", "depends_on": []},
+            {"id": "d"},
+        ]
+        self.assertEqual(step_dependencies(steps), [set(), {0}, set(), {2}])
+
+    def test_duplicate_ids_run_in_order(self) -> None:
+        # A defaulted "step-1" colliding with an explicit one.
+        steps = [{"id": "step-1", "description": "x"}, {"id": "step-1"}]
+        self.assertEqual(step_dependencies(steps), [set(), {0}])
+
+    def test_unknown_dependency_runs_in_order(self) -> None:
+        steps = [{"id": "a"}, {"id": "b", "depends_on": ["1"]}, {"id": "c", "depends_on": []}]
+        self.assertEqual(step_dependencies(steps), [set(), {0}, {1}])
+
+    def test_cycle_runs_in_order(self) -> None:
+        steps = [{"id": "a", "depends_on": ["b"]}, {"id": "b", "depends_on": "a"}]
+        self.assertEqual(step_dependencies(steps), [set(), {0}])
+
+
+class StepScheduleTest(unittest.TestCase):
+    def test_duplicate_ids_keep_every_step(self) -> None:
+        schedule = StepSchedule([{"id": "step-1"}, {"id": "step-1"}])
+        self.assertEqual(schedule.start(), [[0]])
+        self.assertEqual(schedule.finish(0, _approved("step-1"), False), [[1]])
+        self.assertEqual(schedule.finish(1, _approved("step-1"), False), [])
+        self.assertEqual(len(schedule.results()), 2)
+
+    def test_replan_stops_scheduling(self) -> None:
+        schedule = StepSchedule([{"id": "a"}, {"id": "b"}])
+        attempts = [SimpleNamespace(step_id="a", review={"approved": False, "feedback": "redo"})]
+        self.assertIsNone(schedule.finish(0, attempts, True))
+        self.assertEqual(schedule.replan_feedback, "redo")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,13 +2,21 @@
 
 from __future__ import annotations
 
+import io
 import json
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from colorama import Fore, Style, init
 
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the standard library
+    orjson = None
+
 init(autoreset=True)
 
 # Rotating color palette for agents so new personas automatically get
@@ -26,6 +34,42 @@ _AGENT_PALETTE = [
 _AGENT_COLOR_CACHE: Dict[str, str] = {}
 
 
+def compact_json(value: Any, *, sort_keys: bool = False) -> str:
+    """Serialise ``value`` for LLM prompts without insignificant whitespace.
+
+    Indented JSON is slower to produce and every space and newline is billed
+    as prompt tokens, so agents embed plans and results in compact form.
+    ``orjson`` is used when installed; both paths emit the same text.
+    """
+
+    if orjson is not None:
+        try:
+            option = orjson.OPT_SORT_KEYS if sort_keys else 0
+            return orjson.dumps(value, option=option).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib handles those.
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys)
+
+
+def json_dumps(value: Any) -> bytes:
+    """Serialise ``value`` to compact UTF-8 JSON bytes, using ``orjson`` when installed."""
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib handles those.
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Parse JSON text, using ``orjson`` when installed."""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def _colour_for_agent(agent_name: str) -> str:
     if agent_name not in _AGENT_COLOR_CACHE:
         index = len(_AGENT_COLOR_CACHE) % len(_AGENT_PALETTE)
@@ -33,54 +77,144 @@ def _colour_for_agent(agent_name: str) -> str:
     return _AGENT_COLOR_CACHE[agent_name]
 
 
-def print_agent_output(agent_name: str, text: Optional[str], log_file_path: Optional[str]) -> None:
-    """Pretty print ``text`` for ``agent_name`` and persist it to the log."""
-
-    colour = _colour_for_agent(agent_name)
-    print(f"{colour}{agent_name}:{Style.RESET_ALL}")
-
-    if text:
-        parsed_text: Any
-        try:
-            parsed_text = json.loads(text)
-        except json.JSONDecodeError:
-            parsed_text = None
+def print_agent_output(
+    agent_name: str,
+    text: Union[str, Dict[str, Any], List[Any], None],
+    log_file_path: Optional[str],
+    *,
+    echo: bool = True,
+) -> None:
+    """Pretty print ``text`` for ``agent_name`` and persist it to the log.
 
-        if isinstance(parsed_text, dict):
-            for key, value in parsed_text.items():
-                formatted_value = value
-                if isinstance(value, bool):
-                    formatted_value = "Yes" if value else "No"
-                elif isinstance(value, list):
-                    formatted_value = ", ".join(str(item) for item in value)
-                print(f"{colour}{key}: {formatted_value}{Style.RESET_ALL}")
-        else:
-            print(f"{colour}{text}{Style.RESET_ALL}")
+    ``text`` may be a raw string or a response the caller already parsed;
+    parsed responses are displayed and logged without re-parsing them. Pass
+    ``echo=False`` when the text has already been shown, e.g. streamed
+    through :class:`AgentStreamPrinter`, and only needs to be logged.
+    """
 
-    print()
+    if echo:
+        _echo_agent_output(agent_name, text)
 
     if not log_file_path:
         return
 
-    log_path = Path(log_file_path)
-    log_data: Dict[str, Any]
+    # Append a single JSON line instead of rewriting the whole log so each
+    # message costs O(record) rather than O(log size).
+    record = {"ts": datetime.utcnow().isoformat(), "agent_name": agent_name, "text": text}
+    with open(log_file_path, "a", buffering=1, encoding="utf-8") as log_file:
+        log_file.write(compact_json(record) + "\n")
+
+
+# Display formatters for JSON values keyed by exact type; other values are
+# rendered with ``str``.
+_VALUE_FORMATTERS = {
+    bool: lambda value: "Yes" if value else "No",
+    list: lambda value: ", ".join(str(item) for item in value),
+}
+
+
+def _echo_agent_output(agent_name: str, text: Union[str, Dict[str, Any], List[Any], None]) -> None:
+    colour = _colour_for_agent(agent_name)
+    # Build the whole block and emit it with one write and a single reset.
+    buffer = [f"{colour}{agent_name}:{Style.RESET_ALL}\n"]
+
+    if isinstance(text, list):
+        text = compact_json(text)
 
-    if log_path.exists():
-        log_data = json.loads(log_path.read_text())
-    else:
-        log_data = {"created_at": datetime.utcnow().isoformat(), "output": []}
+    if text:
+        parsed_text: Any = text if isinstance(text, dict) else None
+        if parsed_text is None:
+            try:
+                parsed_text = json_loads(text)
+            except json.JSONDecodeError:
+                pass
 
-    log_data.setdefault("output", []).append({"agent_name": agent_name, "text": text})
-    log_path.write_text(json.dumps(log_data, indent=2))
+        if isinstance(parsed_text, dict):
+            for key, value in parsed_text.items():
+                formatter = _VALUE_FORMATTERS.get(type(value))
+                buffer.append(f"{colour}{key}: {formatter(value) if formatter else value}\n")
+        else:
+            buffer.append(f"{colour}{text}\n")
+
+    sys.stdout.write("".join(buffer) + Style.RESET_ALL + "\n")
+
+
+class AgentStreamPrinter:
+    """Echoes a streamed response while coalescing tiny deltas into larger writes.
+
+    Deltas are buffered until at least ``min_chars`` characters or
+    ``max_delay`` seconds have accumulated, so a response costs a handful of
+    terminal writes rather than one per token.
+    """
+
+    def __init__(self, agent_name: str, *, min_chars: int = 64, max_delay: float = 0.05) -> None:
+        self.colour = _colour_for_agent(agent_name)
+        self.min_chars = min_chars
+        self.max_delay = max_delay
+        self._text = io.StringIO()
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._last_flush = time.monotonic()
+        sys.stdout.write(f"{self.colour}{agent_name}:{Style.RESET_ALL}\n")
+        sys.stdout.flush()
+
+    def feed(self, delta: str) -> None:
+        if not delta:
+            return
+        self._text.write(delta)
+        self._pending.append(delta)
+        self._pending_chars += len(delta)
+        if (
+            self._pending_chars >= self.min_chars
+            or time.monotonic() - self._last_flush >= self.max_delay
+        ):
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            sys.stdout.write(f"{self.colour}{''.join(self._pending)}{Style.RESET_ALL}")
+            sys.stdout.flush()
+            self._pending.clear()
+            self._pending_chars = 0
+        self._last_flush = time.monotonic()
+
+    @property
+    def text(self) -> str:
+        return self._text.getvalue()
+
+    def close(self) -> str:
+        """Flush remaining output and return the complete response text."""
+
+        self._flush()
+        sys.stdout.write("\n\n")
+        sys.stdout.flush()
+        return self._text.getvalue()
 
 
 def initialise_log_file(run_name: str) -> str:
-    """Create a new log file for ``run_name`` and return its path."""
+    """Create a new JSON Lines log file for ``run_name`` and return its path.
+
+    The first line is a header record; every subsequent line is one agent
+    message as written by :func:`print_agent_output`.
+    """
 
     logs_dir = Path("logs")
     logs_dir.mkdir(exist_ok=True)
 
     timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-    log_file = logs_dir / f"{run_name}-{timestamp}.json"
-    log_file.write_text(json.dumps({"run_name": run_name, "output": []}, indent=2))
+    log_file = logs_dir / f"{run_name}-{timestamp}.jsonl"
+    header = {"run_name": run_name, "created_at": datetime.utcnow().isoformat()}
+    log_file.write_text(compact_json(header) + "\n", encoding="utf-8")
     return str(log_file)
+
+
+def logs_to_json(log_file_path: str) -> Dict[str, Any]:
+    """Merge a JSON Lines log into a single ``{..., "output": [...]}`` object."""
+
+    lines = Path(log_file_path).read_text(encoding="utf-8").splitlines()
+    if not lines:
+        return {"output": []}
+
+    merged: Dict[str, Any] = json_loads(lines[0])
+    merged["output"] = [json_loads(line) for line in lines[1:] if line]
+    return merged
@@ -2,54 +2,36 @@
 
 from __future__ import annotations
 
+import os
+import queue
+import re
+import threading
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
 
 from Agents import CoordinatorAgent, ExecutorAgent, PlannerAgent, ReviewerAgent
+from agent_types import StepResult, Task, encode_step_results
+from batch import BatchRunner
+from cache import PlanCache, SemanticLookup
+from plan_schedule import StepSchedule
+from report_io import UringReportWriter, create_uring_writer
+from utils import json_dumps
+from workflow_async import AsyncWorkflowMixin
 
+try:  # pragma: no cover - optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - fall back to pure Python counting
+    np = None
 
-@dataclass
-class Task:
-    """Represents a user-defined automation task."""
+# Characters replaced by "-" in report file names (one dash per character).
+_SLUG_RE = re.compile(r"[^\w-]")
 
-    name: str
-    objective: str
-    context: Optional[str] = None
-    deliverable: Optional[str] = None
-    constraints: Optional[List[str]] = None
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "name": self.name,
-            "objective": self.objective,
-            "context": self.context,
-            "deliverable": self.deliverable,
-            "constraints": self.constraints or [],
-        }
-
-
-@dataclass
-class StepResult:
-    """Captures the outcome of a single execution attempt."""
-
-    step_id: str
-    step: Dict[str, Any]
-    output: Dict[str, Any]
-    review: Dict[str, Any]
-    attempt: int
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "step_id": self.step_id,
-            "attempt": self.attempt,
-            "step": self.step,
-            "output": self.output,
-            "review": self.review,
-        }
-
-
-@dataclass
+@dataclass(slots=True)
 class TaskRunResult:
     """Aggregated information for a completed task run."""
 
@@ -68,41 +50,84 @@ class TaskRunResult:
             "coordinator_summary": self.coordinator_summary,
         }
 
+    def encode_json(self, buf: bytearray) -> None:
+        """Append the compact JSON form of :meth:`to_dict` to ``buf``."""
+
+        buf += b'{"task":'
+        buf += json_dumps(self.task.to_dict())
+        buf += b',"plan":'
+        buf += json_dumps(self.plan)
+        buf += b',"step_results":'
+        encode_step_results(self.step_results, buf)
+        buf += b',"reviewer_summary":'
+        buf += json_dumps(self.reviewer_summary)
+        buf += b',"coordinator_summary":'
+        buf += json_dumps(self.coordinator_summary)
+        buf += b"}"
+
     def to_markdown(self) -> str:
-        lines = [
-            f"# Task Report: {self.task.name}",
-            "",
-            f"**Objective:** {self.task.objective}",
-        ]
-        if self.task.context:
-            lines.append(f"**Context:** {self.task.context}")
-        if self.task.deliverable:
-            lines.append(f"**Expected Deliverable:** {self.task.deliverable}")
-        lines.extend(["", "## Plan Overview", self.plan.get("plan_overview", "No overview provided."), ""])
-
-        lines.append("## Execution Timeline")
-        if not self.step_results:
-            lines.append("No steps were executed.")
-        else:
-            for result in self.step_results:
-                status = "Approved" if result.review.get("approved") else "Pending"
-                lines.append(f"- **{result.step_id}** (attempt {result.attempt}, {status}): {result.output.get('summary', 'No summary available')}")
-        lines.append("")
+        task = self.task
+        context = f"\n**Context:** {task.context}" if task.context else ""
+        deliverable = f"\n**Expected Deliverable:** {task.deliverable}" if task.deliverable else ""
+        timeline = "\n".join(
+            f"- **{result.step_id}** (attempt {result.attempt}, "
+            f"{'Approved' if result.review.get('approved') else 'Pending'}): "
+            f"{result.output.get('summary', 'No summary available')}"
+            for result in self.step_results
+        ) or "No steps were executed."
+        coordinator = (
+            f"\n## Coordinator Summary\n{self.coordinator_summary}\n"
+            if self.coordinator_summary
+            else ""
+        )
+        return (
+            f"# Task Report: {task.name}\n"
+            "\n"
+            f"**Objective:** {task.objective}{context}{deliverable}\n"
+            "\n"
+            "## Plan Overview\n"
+            f"{self.plan.get('plan_overview', 'No overview provided.')}\n"
+            "\n"
+            "## Execution Timeline\n"
+            f"{timeline}\n"
+            "\n"
+            "## Reviewer Verdict\n"
+            f"{self.reviewer_summary.get('feedback', 'No reviewer feedback recorded.')}\n"
+            f"{coordinator}"
+        )
+
+
+@dataclass(slots=True)
+class TaskRunResultSoA:
+    """Column-oriented copy of a run's step attempts for aggregation.
 
-        lines.append("## Reviewer Verdict")
-        lines.append(self.reviewer_summary.get("feedback", "No reviewer feedback recorded."))
-        lines.append("")
+    ``attempts`` and ``approvals`` hold one entry per attempt in contiguous
+    ``array`` buffers, so :meth:`AutomationWorkflow._summarize_results` scans
+    each field on its own (through zero-copy NumPy views when installed)
+    instead of visiting every :class:`StepResult`.
+    """
 
-        if self.coordinator_summary:
-            lines.append("## Coordinator Summary")
-            lines.append(self.coordinator_summary)
-            lines.append("")
+    attempts: array = field(default_factory=lambda: array("i"))
+    approvals: array = field(default_factory=lambda: array("b"))
 
-        return "\n".join(lines)
+    @classmethod
+    def from_step_results(cls, results: Iterable[StepResult]) -> TaskRunResultSoA:
+        columns = cls()
+        for result in results:
+            columns.attempts.append(result.attempt)
+            columns.approvals.append(bool(result.review["approved"]))
+        return columns
 
+    def __len__(self) -> int:
+        return len(self.attempts)
 
-class AutomationWorkflow:
-    """Coordinates planner, executor, reviewer, and coordinator agents."""
+
+class AutomationWorkflow(AsyncWorkflowMixin):
+    """Coordinates planner, executor, reviewer, and coordinator agents.
+
+    The synchronous ``run_*`` methods are defined here; their ``arun_*``
+    counterparts come from :class:`AsyncWorkflowMixin`.
+    """
 
     def __init__(
         self,
@@ -116,6 +141,12 @@ class AutomationWorkflow:
         max_plan_iterations: int = 3,
         max_step_iterations: int = 3,
         max_replan_attempts: int = 2,
+        max_concurrency: int = 8,
+        batch_plan_size: int = 1,
+        plan_cache: Optional[PlanCache] = None,
+        max_step_workers: int = 4,
+        json_reports: bool = False,
+        io_uring_reports: bool = False,
     ) -> None:
         self.planner = planner
         self.executor = executor
@@ -125,47 +156,166 @@ class AutomationWorkflow:
         self.max_plan_iterations = max_plan_iterations
         self.max_step_iterations = max_step_iterations
         self.max_replan_attempts = max_replan_attempts
+        self.max_concurrency = max_concurrency
+        self.batch_plan_size = batch_plan_size
+        self.plan_cache = plan_cache
+        self.max_step_workers = max_step_workers
+        self.json_reports = json_reports
         self.reports_dir = reports_dir
         self.reports_dir.mkdir(exist_ok=True)
+        # Report paths are plain strings built from this prefix, skipping
+        # ``Path`` construction and normalisation for every report.
+        self._reports_prefix = str(self.reports_dir.resolve()) + os.sep
+        # Reports are written by a single background thread so tasks never
+        # wait on disk I/O; ``flush`` blocks until the queue has drained.
+        self._write_queue: queue.Queue[Tuple[str, bytes]] = queue.Queue()
+        self._write_error: Optional[BaseException] = None
+        # Batches queued reports into one io_uring submission when requested and
+        # supported; otherwise reports are written one at a time.
+        self._uring_writer: Optional[UringReportWriter] = (
+            create_uring_writer() if io_uring_reports else None
+        )
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name="report-writer", daemon=True
+        )
+        self._writer_thread.start()
 
-    def run_all(self, tasks: Iterable[Task]) -> List[TaskRunResult]:
-        results: List[TaskRunResult] = []
-        for task in tasks:
-            result = self.run_task(task)
-            results.append(result)
-        return results
+    def run_all(
+        self,
+        tasks: Iterable[Task],
+        *,
+        initial_plans: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> List[TaskRunResult]:
+        """Run ``tasks`` on up to ``max_concurrency`` threads.
+
+        Results keep the order of ``tasks``. Every task runs to completion and
+        the first failure, in task order, is re-raised afterwards. With a
+        ``max_concurrency`` of 1 the tasks run one by one on the calling thread.
+        ``initial_plans`` maps task names to plans proposed ahead of time.
+        """
+
+        tasks = list(tasks)
+        plans = self._propose_batched_plans(tasks, initial_plans)
+        try:
+            if self._runs_one_at_a_time(tasks):
+                return [self.run_task(task, initial_plan=plans.get(task.name)) for task in tasks]
+
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(tasks))) as pool:
+                futures = [
+                    pool.submit(self.run_task, task, initial_plan=plans.get(task.name), stream=False)
+                    for task in tasks
+                ]
+            return [future.result() for future in futures]
+        finally:
+            self.flush()
+
+    def run_all_via_batch_api(
+        self,
+        tasks: Iterable[Task],
+        *,
+        batch_provider: Literal["openai", "anthropic"] = "openai",
+        poll_interval: float = 30.0,
+    ) -> List[TaskRunResult]:
+        """Propose every initial plan in one provider batch job, then run ``tasks``.
+
+        Suited to offline runs such as evaluations: batch jobs cost roughly
+        half as much per token but may take up to a day to complete.
+        """
+
+        tasks = list(tasks)
+        initial_plans = self.propose_plans_via_batch_api(
+            tasks, batch_provider=batch_provider, poll_interval=poll_interval
+        )
+        return self.run_all(tasks, initial_plans=initial_plans)
+
+    def propose_plans_via_batch_api(
+        self,
+        tasks: Iterable[Task],
+        *,
+        batch_provider: Literal["openai", "anthropic"] = "openai",
+        poll_interval: float = 30.0,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Propose initial plans for ``tasks`` through one Batch API job.
+
+        Returns plans keyed by task name. Tasks whose batch request failed are
+        left out and planned interactively by :meth:`run_task` instead.
+        """
+
+        if batch_provider != "openai":
+            raise ValueError(f"Unsupported batch provider '{batch_provider}'.")
+
+        tasks = list(tasks)
+        runner = BatchRunner(self.planner.client, poll_interval=poll_interval)
+        responses = runner.run(
+            {
+                f"plan-{index}": self.planner.render_plan_payload(task)
+                for index, task in enumerate(tasks)
+            }
+        )
+
+        plans: Dict[str, Dict[str, Any]] = {}
+        for index, task in enumerate(tasks):
+            response = responses.get(f"plan-{index}")
+            if response is not None:
+                plans[task.name] = self.planner.accept_plan(
+                    task, response, log_file_path=self.log_file_path
+                )
+        return plans
+
+    def run_task(
+        self,
+        task: Task,
+        *,
+        initial_plan: Optional[Dict[str, Any]] = None,
+        stream: bool = True,
+    ) -> TaskRunResult:
+        """Plan, execute and report on ``task``.
+
+        ``initial_plan`` stands in for the planner's first proposal and goes
+        straight to review; later revisions are requested from the planner.
+        ``stream`` echoes coordinator notes as they are generated; turn it off
+        when other tasks print at the same time.
+        """
 
-    def run_task(self, task: Task) -> TaskRunResult:
         if self.coordinator:
-            self.coordinator.kickoff_task(task, log_file_path=self.log_file_path)
+            self.coordinator.kickoff_task(task, stream=stream, log_file_path=self.log_file_path)
 
+        cached_plan, plan_probe = self._lookup_cached_plan(task)
         previous_plan: Optional[Dict[str, Any]] = None
         feedback: Optional[str] = None
         plan_attempt = 0
 
         while plan_attempt < self.max_plan_iterations:
             plan_attempt += 1
-            plan = self.planner.propose_plan(
-                task,
-                feedback=feedback,
-                previous_plan=previous_plan,
-                log_file_path=self.log_file_path,
-            )
-            plan_review = self.reviewer.review_plan(
-                task,
-                plan,
-                iteration=plan_attempt,
-                log_file_path=self.log_file_path,
-            )
-            if not plan_review.get("approved"):
-                feedback = plan_review.get("feedback")
-                previous_plan = plan
-                continue
+            if cached_plan is not None:
+                # Cached plans already carried an equivalent task to completion.
+                plan, cached_plan = cached_plan, None
+            else:
+                if initial_plan is not None:
+                    plan, initial_plan = initial_plan, None
+                else:
+                    plan = self.planner.propose_plan(
+                        task,
+                        feedback=feedback,
+                        previous_plan=previous_plan,
+                        log_file_path=self.log_file_path,
+                    )
+                plan_review = self.reviewer.review_plan(
+                    task,
+                    plan,
+                    iteration=plan_attempt,
+                    log_file_path=self.log_file_path,
+                )
+                if not plan_review.get("approved"):
+                    feedback = plan_review.get("feedback")
+                    previous_plan = plan
+                    continue
 
             replan_attempts = 0
             while True:
-                run_result, execution_feedback = self._execute_plan(task, plan)
+                run_result, execution_feedback = self._execute_plan(task, plan, stream=stream)
                 if run_result is not None:
+                    self._remember_plan(task, plan, plan_probe)
                     return run_result
 
                 replan_attempts += 1
@@ -181,70 +331,260 @@ class AutomationWorkflow:
         raise RuntimeError(f"Exceeded maximum plan attempts for task '{task.name}'.")
 
     # ------------------------------------------------------------------
-    def _execute_plan(self, task: Task, plan: Dict[str, Any]) -> Tuple[Optional[TaskRunResult], Optional[str]]:
-        steps = plan.get("steps") or []
-        if not isinstance(steps, list):
-            raise ValueError("Planner response must contain a 'steps' array.")
+    def _lookup_cached_plan(
+        self,
+        task: Task,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[SemanticLookup]]:
+        if self.plan_cache is None:
+            return None, None
+        return self.plan_cache.lookup(task)
+
+    def _remember_plan(
+        self,
+        task: Task,
+        plan: Dict[str, Any],
+        probe: Optional[SemanticLookup],
+    ) -> None:
+        if self.plan_cache is not None:
+            self.plan_cache.store(task, plan, probe)
+
+    def _plan_batches(
+        self,
+        tasks: List[Task],
+        plans: Dict[str, Dict[str, Any]],
+    ) -> List[List[Task]]:
+        """Split the tasks that still lack a plan into ``batch_plan_size`` chunks."""
+
+        size = self.batch_plan_size
+        if size <= 1:
+            return []
+        pending = [task for task in tasks if task.name not in plans]
+        return [pending[start : start + size] for start in range(0, len(pending), size)]
+
+    def _propose_batched_plans(
+        self,
+        tasks: List[Task],
+        initial_plans: Optional[Dict[str, Dict[str, Any]]],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Extend ``initial_plans`` with plans proposed ``batch_plan_size`` tasks at a time.
+
+        A batch whose response cannot be matched to its tasks is dropped and
+        those tasks are planned individually by :meth:`run_task`.
+        """
+
+        plans = dict(initial_plans or {})
+        for chunk in self._plan_batches(tasks, plans):
+            try:
+                batch = self.planner.propose_plans_batch(chunk, log_file_path=self.log_file_path)
+            except ValueError:
+                continue
+            plans.update(zip((task.name for task in chunk), batch))
+        return plans
 
-        all_results: List[StepResult] = []
-        approved_results: List[StepResult] = []
+    def _plan_steps(self, plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the plan's steps with ids filled in for steps that lack one."""
 
-        for index, raw_step in enumerate(steps, start=1):
+        raw_steps = plan.get("steps") or []
+        if not isinstance(raw_steps, list):
+            raise ValueError("Planner response must contain a 'steps' array.")
+
+        steps: List[Dict[str, Any]] = []
+        for index, raw_step in enumerate(raw_steps, start=1):
             step = dict(raw_step)
             step.setdefault("id", f"step-{index}")
-            require_replan = False
-            attempt_feedback: Optional[str] = None
-            step_attempts: List[StepResult] = []
+            steps.append(step)
+        return steps
+
+    @staticmethod
+    def _summarize_results(results: List[StepResult]) -> Dict[str, Any]:
+        """Aggregate attempt statistics handed to the final review.
+
+        Every step contributes one attempt numbered 1, so those entries count
+        the steps; ``first_pass_rate`` is the share approved on that attempt.
+        """
+
+        columns = TaskRunResultSoA.from_step_results(results)
+        count = len(columns)
+        if np is not None and count:
+            attempts = np.frombuffer(columns.attempts, dtype=np.intc)
+            approvals = np.frombuffer(columns.approvals, dtype=np.bool_)
+            first_attempts = attempts == 1
+            steps = int(np.count_nonzero(first_attempts))
+            approved = int(np.count_nonzero(approvals))
+            first_pass = int(np.count_nonzero(approvals & first_attempts))
+        else:
+            steps = columns.attempts.count(1)
+            approved = sum(columns.approvals)
+            first_pass = sum(
+                approval
+                for attempt, approval in zip(columns.attempts, columns.approvals)
+                if attempt == 1
+            )
+        return {
+            "steps": steps,
+            "attempts": count,
+            "approval_rate": round(approved / count, 3) if count else 0.0,
+            "mean_attempts": round(count / steps, 3) if steps else 0.0,
+            "first_pass_rate": round(first_pass / steps, 3) if steps else 0.0,
+        }
 
-            for attempt in range(1, self.max_step_iterations + 1):
-                execution_output = self.executor.execute_step(
-                    task,
-                    step,
-                    prior_results=approved_results,
-                    feedback=attempt_feedback,
-                    log_file_path=self.log_file_path,
-                )
-                step_review = self.reviewer.review_step(
-                    task,
-                    step,
-                    execution_output,
-                    attempt=attempt,
-                    log_file_path=self.log_file_path,
-                )
-                step_result = StepResult(
-                    step_id=step["id"],
+    def _run_step(
+        self,
+        task: Task,
+        step: Dict[str, Any],
+        context: Dict[str, Any],
+        first_output: Optional[Dict[str, Any]] = None,
+        abandoned: Optional[threading.Event] = None,
+    ) -> Tuple[List[StepResult], bool]:
+        """Execute and review ``step`` until approved, a re-plan is requested, or attempts run out.
+
+        ``first_output`` replaces the executor call for the first attempt, e.g.
+        when it came from a batched call. Once ``abandoned`` is set no further
+        attempts are made. Returns every attempt and whether the reviewer asked
+        for a re-plan.
+        """
+
+        # Only the feedback and attempt number change between attempts, so the
+        # agent calls are bound once per step.
+        execute = partial(
+            self.executor.execute_step,
+            task,
+            step,
+            log_file_path=self.log_file_path,
+            **context,
+        )
+        review = partial(self.reviewer.review_step, task, step, log_file_path=self.log_file_path)
+        step_id = step["id"]
+        attempt_feedback: Optional[str] = None
+        step_attempts: List[StepResult] = []
+
+        for attempt in range(1, self.max_step_iterations + 1):
+            if abandoned is not None and abandoned.is_set():
+                break
+            if attempt == 1 and first_output is not None:
+                execution_output = first_output
+            else:
+                execution_output = execute(feedback=attempt_feedback)
+            step_review = review(execution_output, attempt=attempt)
+            try:
+                approved = step_review["approved"]
+                requires_replan = step_review["requires_replan"]
+                feedback = step_review["feedback"]
+            except KeyError:  # custom reviewers may omit keys ReviewerAgent always sets
+                step_review = ReviewerAgent.normalise_step_review(step_review)
+                approved = step_review["approved"]
+                requires_replan = step_review["requires_replan"]
+                feedback = step_review["feedback"]
+            step_attempts.append(
+                StepResult(
+                    step_id=step_id,
                     step=step,
                     output=execution_output,
                     review=step_review,
                     attempt=attempt,
                 )
-                step_attempts.append(step_result)
+            )
 
-                if step_review.get("approved"):
-                    approved_results.append(step_result)
-                    break
+            if approved:
+                break
 
-                if step_review.get("requires_replan"):
-                    require_replan = True
-                    break
+            if requires_replan:
+                return step_attempts, True
 
-                attempt_feedback = step_review.get("feedback")
+            attempt_feedback = feedback
 
-            all_results.extend(step_attempts)
+        return step_attempts, False
 
-            if require_replan:
-                feedback = step_attempts[-1].review.get("feedback") if step_attempts else None
-                return None, feedback
+    def _runs_one_at_a_time(self, tasks: List[Task]) -> bool:
+        """Whether ``tasks`` run sequentially, so streamed output cannot interleave."""
 
-            if not step_attempts or not step_attempts[-1].review.get("approved"):
-                raise RuntimeError(
-                    f"Step '{step['id']}' was not approved after {self.max_step_iterations} attempts."
-                )
+        return self.max_concurrency <= 1 or len(tasks) <= 1
+
+    def _execute_plan(
+        self,
+        task: Task,
+        plan: Dict[str, Any],
+        *,
+        stream: bool = True,
+    ) -> Tuple[Optional[TaskRunResult], Optional[str]]:
+        schedule = StepSchedule(
+            self._plan_steps(plan), getattr(self.executor, "progress_line", None)
+        )
+        steps = schedule.steps
+
+        # Steps whose dependencies are approved run concurrently. Only this
+        # thread touches the schedule; workers get a snapshot of the context
+        # at submission time. A group of several ready steps makes its first
+        # attempt in one batched executor call when the executor supports it.
+        execute_batch = getattr(self.executor, "execute_steps_batch", None)
+        abandoned = threading.Event()
+        with ThreadPoolExecutor(max_workers=max(self.max_step_workers, 1)) as pool:
+            pending: Dict[Future, int] = {}
+            batches: Dict[Future, Tuple[List[int], Dict[str, Any]]] = {}
+
+            def launch(group: List[int]) -> None:
+                context = schedule.context(group)
+                if len(group) > 1 and execute_batch is not None:
+                    future = pool.submit(
+                        execute_batch,
+                        task,
+                        [steps[position] for position in group],
+                        log_file_path=self.log_file_path,
+                        **context,
+                    )
+                    batches[future] = (group, context)
+                    return
+                for position in group:
+                    future = pool.submit(
+                        self._run_step, task, steps[position], context, abandoned=abandoned
+                    )
+                    pending[future] = position
+
+            for group in schedule.start():
+                launch(group)
+
+            try:
+                while pending or batches:
+                    done, _ = wait([*pending, *batches], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in batches:
+                            group, context = batches.pop(future)
+                            try:
+                                outputs = future.result()
+                            except ValueError:
+                                outputs = [None] * len(group)
+                            for position, output in zip(group, outputs):
+                                step_future = pool.submit(
+                                    self._run_step,
+                                    task,
+                                    steps[position],
+                                    context,
+                                    output,
+                                    abandoned=abandoned,
+                                )
+                                pending[step_future] = position
+                            continue
+
+                        groups = schedule.finish(pending.pop(future), *future.result())
+                        if groups is None:
+                            return None, schedule.replan_feedback
+                        for group in groups:
+                            launch(group)
+            finally:
+                # Once the plan is abandoned, drop queued steps and stop running
+                # ones after their current attempt rather than waiting for them
+                # to use up every remaining attempt.
+                abandoned.set()
+                for future in [*pending, *batches]:
+                    future.cancel()
+
+        all_results = schedule.results()
 
         reviewer_summary = self.reviewer.final_review(
             task,
             plan,
             all_results,
+            stats=self._summarize_results(all_results),
             log_file_path=self.log_file_path,
         )
 
@@ -255,26 +595,85 @@ class AutomationWorkflow:
                 plan,
                 all_results,
                 reviewer_summary,
+                stream=stream,
                 log_file_path=self.log_file_path,
             )
 
+        return self._finish_run(task, plan, all_results, reviewer_summary, coordinator_summary), None
+
+    def _finish_run(
+        self,
+        task: Task,
+        plan: Dict[str, Any],
+        step_results: List[StepResult],
+        reviewer_summary: Dict[str, Any],
+        coordinator_summary: Optional[str],
+    ) -> TaskRunResult:
         result = TaskRunResult(
             task=task,
             plan=plan,
-            step_results=all_results,
+            step_results=step_results,
             reviewer_summary=reviewer_summary,
             coordinator_summary=coordinator_summary,
         )
         self._write_report(result)
-        return result, None
+        return result
 
     def _write_report(self, result: TaskRunResult) -> None:
-        safe_name = "".join(
-            char.lower() if char.isalnum() or char in {"-", "_"} else "-"
-            for char in result.task.name
-        ).strip("-")
-        if not safe_name:
-            safe_name = "task"
-        report_path = self.reports_dir / f"{safe_name}.md"
-        report_path.write_text(result.to_markdown())
+        safe_name = _SLUG_RE.sub("-", result.task.name).strip("-").lower() or "task"
+        report_path = self._reports_prefix + safe_name
+        self._write_queue.put((report_path + ".md", result.to_markdown().encode("utf-8")))
+        if self.json_reports:
+            json_report = bytearray()
+            result.encode_json(json_report)
+            self._write_queue.put((report_path + ".json", bytes(json_report)))
+
+    def _writer_loop(self) -> None:
+        while True:
+            batch = [self._write_queue.get()]
+            if self._uring_writer is not None:
+                while len(batch) < self._uring_writer.entries:
+                    try:
+                        batch.append(self._write_queue.get_nowait())
+                    except queue.Empty:
+                        break
+            try:
+                if self._uring_writer is not None:
+                    self._uring_writer.write_batch(batch)
+                else:
+                    for path, content in batch:
+                        with open(path, "wb") as report_file:
+                            report_file.write(content)
+            except BaseException as exc:  # surfaced to the caller by ``flush``
+                if self._write_error is None:
+                    self._write_error = exc
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued report is on disk.
+
+        ``run_all`` and ``arun_all`` flush before returning; call this after
+        using :meth:`run_task` directly. The first write error, if any, is
+        re-raised here.
+        """
+
+        self._write_queue.join()
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Flush pending reports and release the io_uring ring, if any.
+
+        Reports written after closing fall back to ordinary file writes.
+        """
+
+        try:
+            self.flush()
+        finally:
+            uring_writer, self._uring_writer = self._uring_writer, None
+            if uring_writer is not None:
+                uring_writer.close()
 
@@ -0,0 +1,340 @@
+"""Asynchronous task runners for :class:`workflow.AutomationWorkflow`."""
+
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Iterable, List, Optional, Tuple
+
+from Agents import ReviewerAgent
+from agent_types import StepResult, Task
+from plan_schedule import StepSchedule
+
+if TYPE_CHECKING:  # pragma: no cover - workflow imports this module
+    from workflow import TaskRunResult
+
+
+async def _acall(agent: Any, method: str, *args: Any, **kwargs: Any) -> Any:
+    """Await ``agent.a<method>`` or run the blocking ``agent.<method>`` in a thread.
+
+    Built-in agents provide native coroutines; custom agents that only
+    implement the synchronous interface still run without blocking the loop.
+    """
+
+    async_method = getattr(agent, f"a{method}", None)
+    if async_method is not None:
+        return await async_method(*args, **kwargs)
+    return await asyncio.to_thread(getattr(agent, method), *args, **kwargs)
+
+
+class AsyncWorkflowMixin:
+    """Adds ``asyncio`` runners that overlap LLM round-trips across tasks.
+
+    Expects the host class to provide the agents, limits and report helpers
+    defined by :class:`workflow.AutomationWorkflow`. Within a task, steps are
+    scheduled by their ``depends_on`` ids: each step starts once the steps it
+    builds on are approved, so independent steps run concurrently up to
+    ``max_step_workers``.
+    """
+
+    async def arun_all(
+        self,
+        tasks: Iterable[Task],
+        *,
+        initial_plans: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> List[TaskRunResult]:
+        """Run ``tasks`` concurrently, at most ``max_concurrency`` at a time.
+
+        Every task runs to completion even if another one fails; the first
+        failure is re-raised once all tasks have finished. ``initial_plans``
+        maps task names to plans proposed ahead of time (e.g. via a batch job).
+        """
+
+        tasks = list(tasks)
+        initial_plans = await self._apropose_batched_plans(tasks, initial_plans)
+        semaphore = asyncio.Semaphore(max(self.max_concurrency, 1))
+        stream = self._runs_one_at_a_time(tasks)
+
+        async def _bounded(task: Task) -> TaskRunResult:
+            async with semaphore:
+                return await self.arun_task(
+                    task, initial_plan=initial_plans.get(task.name), stream=stream
+                )
+
+        outcomes = await asyncio.gather(
+            *(_bounded(task) for task in tasks),
+            return_exceptions=True,
+        )
+        await asyncio.to_thread(self.flush)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return list(outcomes)
+
+    async def arun_task(
+        self,
+        task: Task,
+        *,
+        initial_plan: Optional[Dict[str, Any]] = None,
+        stream: bool = True,
+    ) -> TaskRunResult:
+        """Asynchronous counterpart of :meth:`run_task`."""
+
+        if self.coordinator:
+            await _acall(
+                self.coordinator,
+                "kickoff_task",
+                task,
+                stream=stream,
+                log_file_path=self.log_file_path,
+            )
+
+        # Semantic lookups embed the task, which is a blocking network call.
+        cached_plan, plan_probe = await asyncio.to_thread(self._lookup_cached_plan, task)
+        previous_plan: Optional[Dict[str, Any]] = None
+        feedback: Optional[str] = None
+        plan_attempt = 0
+
+        while plan_attempt < self.max_plan_iterations:
+            plan_attempt += 1
+            if cached_plan is not None:
+                # Cached plans already carried an equivalent task to completion.
+                plan, cached_plan = cached_plan, None
+            else:
+                if initial_plan is not None:
+                    plan, initial_plan = initial_plan, None
+                else:
+                    plan = await _acall(
+                        self.planner,
+                        "propose_plan",
+                        task,
+                        feedback=feedback,
+                        previous_plan=previous_plan,
+                        log_file_path=self.log_file_path,
+                    )
+                plan_review = await _acall(
+                    self.reviewer,
+                    "review_plan",
+                    task,
+                    plan,
+                    iteration=plan_attempt,
+                    log_file_path=self.log_file_path,
+                )
+                if not plan_review.get("approved"):
+                    feedback = plan_review.get("feedback")
+                    previous_plan = plan
+                    continue
+
+            replan_attempts = 0
+            while True:
+                run_result, execution_feedback = await self._aexecute_plan(task, plan, stream=stream)
+                if run_result is not None:
+                    self._remember_plan(task, plan, plan_probe)
+                    return run_result
+
+                replan_attempts += 1
+                if replan_attempts > self.max_replan_attempts:
+                    raise RuntimeError(
+                        f"Exceeded maximum execution replans for task '{task.name}'."
+                    )
+
+                feedback = execution_feedback or "Reviewer requested a re-plan during execution."
+                previous_plan = plan
+                break
+
+        raise RuntimeError(f"Exceeded maximum plan attempts for task '{task.name}'.")
+
+    # ------------------------------------------------------------------
+    async def _apropose_batched_plans(
+        self,
+        tasks: List[Task],
+        initial_plans: Optional[Dict[str, Dict[str, Any]]],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Asynchronous counterpart of ``_propose_batched_plans``; batches run concurrently."""
+
+        plans = dict(initial_plans or {})
+        chunks = self._plan_batches(tasks, plans)
+        batches = await asyncio.gather(
+            *(
+                _acall(self.planner, "propose_plans_batch", chunk, log_file_path=self.log_file_path)
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+        for chunk, batch in zip(chunks, batches):
+            if isinstance(batch, ValueError):
+                continue
+            if isinstance(batch, BaseException):
+                raise batch
+            plans.update(zip((task.name for task in chunk), batch))
+        return plans
+
+    async def _arun_step(
+        self,
+        task: Task,
+        step: Dict[str, Any],
+        context: Dict[str, Any],
+        first_output: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[StepResult], bool]:
+        """Asynchronous counterpart of ``_run_step``."""
+
+        execute = partial(
+            _acall,
+            self.executor,
+            "execute_step",
+            task,
+            step,
+            log_file_path=self.log_file_path,
+            **context,
+        )
+        review = partial(
+            _acall,
+            self.reviewer,
+            "review_step",
+            task,
+            step,
+            log_file_path=self.log_file_path,
+        )
+        step_id = step["id"]
+        attempt_feedback: Optional[str] = None
+        step_attempts: List[StepResult] = []
+
+        for attempt in range(1, self.max_step_iterations + 1):
+            if attempt == 1 and first_output is not None:
+                execution_output = first_output
+            else:
+                execution_output = await execute(feedback=attempt_feedback)
+            step_review = await review(execution_output, attempt=attempt)
+            try:
+                approved = step_review["approved"]
+                requires_replan = step_review["requires_replan"]
+                feedback = step_review["feedback"]
+            except KeyError:  # custom reviewers may omit keys ReviewerAgent always sets
+                step_review = ReviewerAgent.normalise_step_review(step_review)
+                approved = step_review["approved"]
+                requires_replan = step_review["requires_replan"]
+                feedback = step_review["feedback"]
+            step_attempts.append(
+                StepResult(
+                    step_id=step_id,
+                    step=step,
+                    output=execution_output,
+                    review=step_review,
+                    attempt=attempt,
+                )
+            )
+
+            if approved:
+                break
+
+            if requires_replan:
+                return step_attempts, True
+
+            attempt_feedback = feedback
+
+        return step_attempts, False
+
+    async def _aexecute_plan(
+        self,
+        task: Task,
+        plan: Dict[str, Any],
+        *,
+        stream: bool = True,
+    ) -> Tuple[Optional[TaskRunResult], Optional[str]]:
+        schedule = StepSchedule(
+            self._plan_steps(plan), getattr(self.executor, "progress_line", None)
+        )
+        steps = schedule.steps
+
+        # Mirrors ``_execute_plan``: ready steps run concurrently, bounded by
+        # ``max_step_workers``, and a group of several ready steps makes its
+        # first attempt in one batched executor call when supported.
+        semaphore = asyncio.Semaphore(max(self.max_step_workers, 1))
+        batch_supported = getattr(self.executor, "execute_steps_batch", None) is not None
+
+        async def _bounded(call: Awaitable[Any]) -> Any:
+            async with semaphore:
+                return await call
+
+        pending: Dict[asyncio.Future, int] = {}
+        batches: Dict[asyncio.Future, Tuple[List[int], Dict[str, Any]]] = {}
+
+        def launch(group: List[int]) -> None:
+            context = schedule.context(group)
+            if len(group) > 1 and batch_supported:
+                call = _acall(
+                    self.executor,
+                    "execute_steps_batch",
+                    task,
+                    [steps[position] for position in group],
+                    log_file_path=self.log_file_path,
+                    **context,
+                )
+                batches[asyncio.ensure_future(_bounded(call))] = (group, context)
+                return
+            for position in group:
+                call = self._arun_step(task, steps[position], context)
+                pending[asyncio.ensure_future(_bounded(call))] = position
+
+        for group in schedule.start():
+            launch(group)
+
+        try:
+            while pending or batches:
+                done, _ = await asyncio.wait(
+                    [*pending, *batches], return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    if future in batches:
+                        group, context = batches.pop(future)
+                        try:
+                            outputs = future.result()
+                        except ValueError:
+                            outputs = [None] * len(group)
+                        for position, output in zip(group, outputs):
+                            call = self._arun_step(task, steps[position], context, output)
+                            pending[asyncio.ensure_future(_bounded(call))] = position
+                        continue
+
+                    groups = schedule.finish(pending.pop(future), *future.result())
+                    if groups is None:
+                        return None, schedule.replan_feedback
+                    for group in groups:
+                        launch(group)
+        finally:
+            # Abandon steps still in flight once the plan is given up on.
+            in_flight = [*pending, *batches]
+            for future in in_flight:
+                future.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+        all_results = schedule.results()
+
+        reviewer_summary = await _acall(
+            self.reviewer,
+            "final_review",
+            task,
+            plan,
+            all_results,
+            stats=self._summarize_results(all_results),
+            log_file_path=self.log_file_path,
+        )
+
+        coordinator_summary: Optional[str] = None
+        if self.coordinator:
+            coordinator_summary = await _acall(
+                self.coordinator,
+                "synthesise_outcome",
+                task,
+                plan,
+                all_results,
+                reviewer_summary,
+                stream=stream,
+                log_file_path=self.log_file_path,
+            )
+
+        return self._finish_run(task, plan, all_results, reviewer_summary, coordinator_summary), None
+
+
+__all__ = ["AsyncWorkflowMixin"]